@@ -1,9 +1,11 @@
-from pydantic_settings import BaseSettings
+from functools import lru_cache
+from pydantic_settings import BaseSettings, SettingsConfigDict
 from pydantic import Field
-from typing import List
-import os
+from typing import List, Optional
 
 class Settings(BaseSettings):
+    model_config = SettingsConfigDict(env_file=".env", case_sensitive=False)
+    
     # Required API Keys
     anthropic_api_key: str = Field(..., env="ANTHROPIC_API_KEY")
     
@@ -18,7 +20,7 @@ class Settings(BaseSettings):
     # Enhanced CV Processing Settings
     enable_enhanced_processing: bool = Field(True, env="ENABLE_ENHANCED_PROCESSING")
     enhanced_processing_timeout: int = Field(60, env="ENHANCED_PROCESSING_TIMEOUT")  # seconds
-    claude_model: str = Field("claude-3-sonnet-20240229", env="CLAUDE_MODEL")
+    claude_model: str = Field("claude-sonnet-4-5-20250929", env="CLAUDE_MODEL")  # CV parsing; must support prompt caching
     max_cv_length: int = Field(50000, env="MAX_CV_LENGTH")  # characters
     max_job_description_length: int = Field(10000, env="MAX_JOB_DESCRIPTION_LENGTH")  # characters
     
@@ -40,8 +42,12 @@ class Settings(BaseSettings):
     enable_skill_caching: bool = Field(True, env="ENABLE_SKILL_CACHING")
     cache_expiry_hours: int = Field(24, env="CACHE_EXPIRY_HOURS")
     
+    # Real-time Analysis Settings
+    realtime_reconnect_grace_seconds: float = Field(10.0, env="REALTIME_RECONNECT_GRACE_SECONDS")
+    
     # Security
     secret_key: str = Field("mvp-secret-key-change-in-production", env="SECRET_KEY")
+    admin_token: Optional[str] = Field(None, env="ADMIN_TOKEN")  # unset disables /ws/monitor
     
     # Chat Settings
     max_message_length: int = Field(4000, env="MAX_MESSAGE_LENGTH")
@@ -59,9 +65,9 @@ class Settings(BaseSettings):
     
     # Premium Contact
     premium_contact_email: str = Field("andrew@automateengage.com", env="PREMIUM_CONTACT_EMAIL")
-    
-    class Config:
-        env_file = ".env"
-        case_sensitive = False
 
-settings = Settings()
\ No newline at end of file
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Load settings on first use and reuse the same instance afterwards"""
+    return Settings()
@@ -2,16 +2,92 @@
 WebSocket endpoints for real-time CV analysis communication
 """
 
+import asyncio
+import hmac
 import logging
-from fastapi import WebSocket, WebSocketDisconnect, Query, Depends
+from fastapi import WebSocket, WebSocketDisconnect, Query
 from typing import Optional
-import json
+from pydantic import ValidationError
 
-from ..services.websocket_manager import websocket_manager
-from ..middleware.auth import get_current_user_optional
+from ..config import get_settings
+from ..services.websocket_manager import (
+    websocket_manager, encode_message, client_message_adapter, PingMessage
+)
 
 logger = logging.getLogger(__name__)
 
+INVALID_JSON_FRAME = encode_message({
+    "type": "error",
+    "error": "Invalid JSON format"
+})
+INVALID_MESSAGE_FRAME = encode_message({
+    "type": "error",
+    "error": "Invalid message format"
+})
+
+# Maximum client frames handled per wakeup
+MAX_RECEIVE_BATCH = 32
+
+# Policy violation close code sent to rejected monitor clients
+UNAUTHORIZED_CLOSE_CODE = 1008
+
+
+def validate_admin_token(admin_token: Optional[str]) -> bool:
+    """Check the admin token in constant time; always fails when no token is configured"""
+    expected = get_settings().admin_token
+    if not expected or not admin_token:
+        return False
+    return hmac.compare_digest(admin_token.encode(), expected.encode())
+
+
+async def _read_frames(websocket: WebSocket, inbox: asyncio.Queue):
+    """Pump incoming text frames into the inbox, then post None once the socket closes"""
+    try:
+        while True:
+            await inbox.put(await websocket.receive_text())
+    except WebSocketDisconnect:
+        pass
+    except Exception as e:
+        logger.error("Error receiving WebSocket message: %s", e)
+    await inbox.put(None)
+
+
+async def _dispatch_batch(websocket: WebSocket, frames: list):
+    """Decode a batch of frames and hand them to the manager, coalescing pings"""
+    messages = []
+    ping = None
+    for raw_message in frames:
+        try:
+            # Parse and validate in one pass, dispatching on the "type" tag
+            message = client_message_adapter.validate_json(raw_message)
+        except ValidationError as e:
+            if any(error["type"] == "json_invalid" for error in e.errors()):
+                await websocket_manager.send_direct(websocket, INVALID_JSON_FRAME)
+            else:
+                logger.warning("Invalid client message: %s", e)
+                await websocket_manager.send_direct(websocket, INVALID_MESSAGE_FRAME)
+            continue
+        
+        # Several pings in one batch only need a single pong
+        if isinstance(message, PingMessage):
+            ping = message
+        else:
+            messages.append(message)
+    
+    if ping is not None:
+        messages.append(ping)
+    
+    for message in messages:
+        try:
+            # Process client message
+            await websocket_manager.handle_client_message(websocket, message)
+        except Exception as e:
+            logger.error("Error handling WebSocket message: %s", e)
+            await websocket_manager.send_direct(websocket, {
+                "type": "error",
+                "error": str(e)
+            })
+
 
 async def websocket_analysis_endpoint(
     websocket: WebSocket,
@@ -45,6 +121,7 @@ async def websocket_analysis_endpoint(
         "authenticated": user is not None
     }
     
+    reader = None
     try:
         # Connect to WebSocket manager
         connection_id = await websocket_manager.connect(
@@ -53,46 +130,41 @@ async def websocket_analysis_endpoint(
             client_info=client_info
         )
         
-        logger.info(f"WebSocket connection established: {connection_id}")
+        logger.info("WebSocket connection established: %s", connection_id)
+        
+        # Receive on a separate task so each wakeup can drain every frame already waiting
+        inbox: asyncio.Queue = asyncio.Queue(maxsize=MAX_RECEIVE_BATCH * 2)
+        reader = asyncio.create_task(_read_frames(websocket, inbox))
         
         # Handle incoming messages
         while True:
-            try:
-                # Receive message from client
-                raw_message = await websocket.receive_text()
-                
-                try:
-                    message = json.loads(raw_message)
-                except json.JSONDecodeError:
-                    await websocket.send_json({
-                        "type": "error",
-                        "error": "Invalid JSON format"
-                    })
-                    continue
-                
-                # Process client message
-                await websocket_manager.handle_client_message(websocket, message)
-                
-            except WebSocketDisconnect:
-                logger.info(f"WebSocket disconnected: {connection_id}")
+            frames = [await inbox.get()]
+            while len(frames) < MAX_RECEIVE_BATCH and not inbox.empty():
+                frames.append(inbox.get_nowait())
+            
+            # The reader posts None once the client has gone
+            closed = frames[-1] is None
+            if closed:
+                frames.pop()
+            
+            await _dispatch_batch(websocket, frames)
+            
+            if closed:
+                logger.info("WebSocket disconnected: %s", connection_id)
                 break
-            except Exception as e:
-                logger.error(f"Error handling WebSocket message: {e}")
-                await websocket.send_json({
-                    "type": "error",
-                    "error": str(e)
-                })
                 
     except Exception as e:
-        logger.error(f"WebSocket error: {e}")
+        logger.error("WebSocket error: %s", e)
     finally:
+        if reader:
+            reader.cancel()
         # Clean up connection
         await websocket_manager.disconnect(websocket)
 
 
 async def websocket_monitor_endpoint(
     websocket: WebSocket,
-    admin_token: str = Query(..., description="Admin authentication token")
+    admin_token: Optional[str] = Query(None, description="Admin authentication token")
 ):
     """
     WebSocket endpoint for monitoring all active sessions (admin only)
@@ -103,22 +175,18 @@ async def websocket_monitor_endpoint(
     """
     
     # Validate admin token
-    # if not validate_admin_token(admin_token):
-    #     await websocket.close(code=1008, reason="Unauthorized")
-    #     return
+    if not validate_admin_token(admin_token):
+        await websocket.close(code=UNAUTHORIZED_CLOSE_CODE, reason="Unauthorized")
+        return
     
     await websocket.accept()
     
     try:
         # Send initial session list
-        sessions = websocket_manager.get_all_sessions()
-        await websocket.send_json({
+        await websocket.send_bytes(encode_message({
             "type": "session_list",
-            "sessions": [
-                websocket_manager.get_session_info(session_id)
-                for session_id in sessions
-            ]
-        })
+            "sessions": websocket_manager.get_sessions_snapshot()
+        }))
         
         # Keep connection alive and send periodic updates
         while True:
@@ -127,22 +195,18 @@ async def websocket_monitor_endpoint(
                 message = await websocket.receive_text()
                 
                 if message == "refresh":
-                    sessions = websocket_manager.get_all_sessions()
-                    await websocket.send_json({
+                    await websocket.send_bytes(encode_message({
                         "type": "session_list",
-                        "sessions": [
-                            websocket_manager.get_session_info(session_id)
-                            for session_id in sessions
-                        ]
-                    })
+                        "sessions": websocket_manager.get_sessions_snapshot()
+                    }))
                     
             except WebSocketDisconnect:
                 break
             except Exception as e:
-                logger.error(f"Monitor WebSocket error: {e}")
+                logger.error("Monitor WebSocket error: %s", e)
                 break
                 
     except Exception as e:
-        logger.error(f"Monitor endpoint error: {e}")
+        logger.error("Monitor endpoint error: %s", e)
     finally:
         await websocket.close()
\ No newline at end of file
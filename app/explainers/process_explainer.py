@@ -4,11 +4,10 @@ Generates human-readable explanations for each AI processing step
 """
 
 import logging
-from typing import Dict, Any, List, Optional, Tuple
+from typing import Dict, Any, List, Optional
 from datetime import datetime
 from enum import Enum
 from pydantic import BaseModel, Field
-import re
 
 logger = logging.getLogger(__name__)
 
@@ -70,6 +69,8 @@ class ProcessExplainer:
     Generates human-readable explanations for CV analysis steps
     """
     
+    __slots__ = ("explanation_templates", "confidence_thresholds")
+    
     def __init__(self):
         self.explanation_templates = self._initialize_templates()
         self.confidence_thresholds = {
@@ -340,10 +341,13 @@ class ProcessExplainer:
             "confidence": explanation.confidence_explanation,
             "evidence": explanation.evidence,
             "suggestions": explanation.suggestions,
-            "timestamp": datetime.utcnow().isoformat()
+            "timestamp": datetime.utcnow()
         }
         
         if include_technical and explanation.technical_details:
             result["technical"] = explanation.technical_details
             
-        return result
\ No newline at end of file
+        return result
+
+# Shared explainer instance (stateless, safe to reuse across requests)
+process_explainer = ProcessExplainer()
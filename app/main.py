@@ -1,9 +1,10 @@
 import logging
-import uuid
-from fastapi import FastAPI, File, UploadFile, HTTPException, Request, Depends
+import secrets
+import orjson
+from fastapi import FastAPI, File, UploadFile, HTTPException, Request, Query
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi.responses import HTMLResponse, JSONResponse, ORJSONResponse, Response
 from typing import Optional
 
 # Conditional WebSocket import for serverless compatibility
@@ -18,7 +19,7 @@ except ImportError:
     websocket_monitor_endpoint = None
 
 # Local imports
-from .config import settings
+from .config import get_settings
 from .models.api_models import (
     ChatMessage, ChatResponse, CVAnalysisRequest, CVAnalysisResponse,
     FileUploadResponse, ActionTrackingRequest, ActionTrackingResponse
@@ -38,6 +39,8 @@ except ImportError:
 from .middleware.rate_limiting import check_rate_limit
 from .middleware.action_tracking import action_tracker
 from .utils.file_utils import FileProcessor
+from .utils.log_sampling import TokenBucket, log_sampled
+from .utils.response_cache import cached_response
 
 # Conditional keep-alive import for Render deployment
 try:
@@ -47,16 +50,22 @@ except ImportError:
     KEEP_ALIVE_AVAILABLE = False
     KeepAliveService = None
 
+settings = get_settings()
+
 # Configure logging
 logging.basicConfig(level=getattr(logging, settings.log_level))
 logger = logging.getLogger(__name__)
 
+# Caps analysis failure logging when a client keeps submitting failing requests
+_analysis_error_bucket = TokenBucket(rate=10, burst=20)
+
 # Initialize FastAPI app
 app = FastAPI(
     title=settings.app_name,
     description="CV Automation and Analysis API",
     version="1.0.0",
-    debug=settings.debug
+    debug=settings.debug,
+    default_response_class=ORJSONResponse
 )
 
 # Configure CORS
@@ -71,7 +80,11 @@ app.add_middleware(
 # Initialize services
 chat_service = ChatService()
 cv_processor = CVProcessor()
-enhanced_cv_processor = EnhancedCVProcessor(api_key=settings.anthropic_api_key)  # New enhanced processor
+enhanced_cv_processor = EnhancedCVProcessor(  # New enhanced processor
+    api_key=settings.anthropic_api_key,
+    cache_ttl_hours=settings.cache_expiry_hours if settings.enable_skill_caching else 0,
+    model=settings.claude_model
+)
 file_processor = FileProcessor()
 
 # Initialize keep-alive service for Render deployment
@@ -83,9 +96,10 @@ if KEEP_ALIVE_AVAILABLE and hasattr(settings, 'app_url') and settings.app_url:
 try:
     app.mount("/static", StaticFiles(directory="frontend"), name="static")
 except Exception as e:
-    logger.warning(f"Could not mount static files: {e}")
+    logger.warning("Could not mount static files: %s", e)
 
 @app.get("/", response_class=HTMLResponse)
+@cached_response(ttl=60)
 async def root():
     """Serve the main application page"""
     try:
@@ -108,10 +122,13 @@ async def root():
             </html>
             """)
 
+# Health payload never changes, so it is encoded once at import
+_HEALTH_BYTES = orjson.dumps({"status": "healthy", "version": "1.0.0"})
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
-    return {"status": "healthy", "version": "1.0.0"}
+    return Response(content=_HEALTH_BYTES, media_type="application/json")
 
 @app.post("/api/chat", response_model=ChatResponse)
 async def chat_endpoint(
@@ -128,7 +145,7 @@ async def chat_endpoint(
     
     # Generate session ID if not provided
     if not session_id:
-        session_id = str(uuid.uuid4())
+        session_id = secrets.token_hex(16)
     
     try:
         # Track action for modal system
@@ -144,7 +161,7 @@ async def chat_endpoint(
         return response
         
     except Exception as e:
-        logger.error(f"Error in chat endpoint: {str(e)}")
+        logger.error("Error in chat endpoint: %s", e)
         raise HTTPException(status_code=500, detail="Internal server error")
 
 @app.post("/api/upload", response_model=FileUploadResponse)
@@ -188,7 +205,7 @@ async def upload_file(
             )
         
         # Generate file ID for reference
-        file_id = str(uuid.uuid4())
+        file_id = secrets.token_hex(16)
         
         return FileUploadResponse(
             success=True,
@@ -198,7 +215,7 @@ async def upload_file(
         )
         
     except Exception as e:
-        logger.error(f"Error uploading file: {str(e)}")
+        logger.error("Error uploading file: %s", e)
         return FileUploadResponse(
             success=False,
             message="Error processing file"
@@ -221,9 +238,7 @@ async def analyze_cv(
         cv_data = cv_processor.extract_cv_data(analysis_request.cv_text)
         
         # Parse job requirements (simplified)
-        from .services.chat_service import ChatService
-        chat_service_instance = ChatService()
-        job_requirements = chat_service_instance._parse_job_description(analysis_request.job_description)
+        job_requirements = chat_service._parse_job_description(analysis_request.job_description)
         
         # Perform analysis
         analysis_result = cv_processor.analyze_cv_match(cv_data, job_requirements)
@@ -231,13 +246,79 @@ async def analyze_cv(
         return analysis_result
         
     except Exception as e:
-        logger.error(f"Error analyzing CV: {str(e)}")
+        log_sampled(logger, _analysis_error_bucket, logging.ERROR, "Error analyzing CV: %s", e)
         raise HTTPException(status_code=500, detail="Analysis failed")
 
+def _enhanced_analysis_response(cv_data, comprehensive_score, job_requirements) -> CVAnalysisResponse:
+    """Convert an enhanced analysis result to the CVAnalysisResponse format"""
+    return CVAnalysisResponse(
+        overall_score=comprehensive_score.overall_match_score,
+        skills_match=comprehensive_score.skills_match_score,
+        experience_match=comprehensive_score.experience_relevance_score,
+        recommendation=cv_processor._generate_recommendation(
+            comprehensive_score.overall_match_score,
+            comprehensive_score.skills_match_score,
+            comprehensive_score.experience_relevance_score,
+            comprehensive_score.education_score
+        ),
+        # Same shape as the basic analysis, which the frontend renders
+        analysis={
+            "skills_match": {
+                "score": comprehensive_score.skills_match_score,
+                "matched_skills": comprehensive_score.matched_skills,
+                "missing_skills": comprehensive_score.missing_skills
+            },
+            "experience_match": {
+                "score": comprehensive_score.experience_relevance_score,
+                "candidate_years": cv_data.total_experience_years,
+                "required_years": job_requirements.min_experience_years
+            },
+            "education_match": {
+                "score": comprehensive_score.education_score,
+                "candidate_education": [edu.degree for edu in cv_data.education],
+                "required_education": job_requirements.education_requirements
+            }
+        },
+        detailed_analysis={
+            "seo_sem_score": comprehensive_score.seo_sem_score,
+            "martech_score": comprehensive_score.martech_operations_score,
+            "advanced_analytics_score": comprehensive_score.advanced_analytics_score,
+            "industry_specialization_score": comprehensive_score.industry_specialization_score,
+            "platform_leadership_score": comprehensive_score.platform_leadership_score,
+            "remote_capability_score": comprehensive_score.remote_capability_score,
+            "executive_readiness_score": comprehensive_score.executive_readiness_score,
+            "traditional_scores": {
+                "technical_skills": comprehensive_score.technical_skills_score,
+                "leadership": comprehensive_score.leadership_score,
+                "education": comprehensive_score.education_score,
+                "cultural_fit": comprehensive_score.cultural_fit_score
+            }
+        },
+        recommendations=comprehensive_score.suggested_interview_questions or [],
+        suggested_interview_questions=comprehensive_score.suggested_interview_questions,
+        candidate_name=cv_data.name,
+        candidate_email=cv_data.contact.email if cv_data.contact else None,
+        extracted_skills=cv_data.skills,
+        enhanced_skills={
+            "seo_sem": cv_data.seo_sem_expertise,
+            "martech": cv_data.martech_proficiency,
+            "advanced_analytics": cv_data.advanced_analytics_skills,
+            "affiliate_marketing": cv_data.affiliate_marketing_experience,
+            "influencer_marketing": cv_data.influencer_marketing_experience,
+            "platform_leadership": cv_data.platform_leadership_experience,
+            "industry_expertise": cv_data.industry_vertical_expertise,
+            "remote_skills": cv_data.remote_collaboration_skills,
+            "executive_skills": cv_data.executive_capabilities,
+            "sales_marketing": cv_data.sales_marketing_integration_skills
+        },
+        comprehensive_score=comprehensive_score
+    )
+
 @app.post("/api/analyze-enhanced", response_model=CVAnalysisResponse)
 async def analyze_cv_enhanced(
     request: Request,
-    analysis_request: CVAnalysisRequest
+    analysis_request: CVAnalysisRequest,
+    no_cache: bool = Query(False, description="Skip cached results and re-run the analysis")
 ):
     """Enhanced CV analysis endpoint with new skill categories"""
     
@@ -249,10 +330,8 @@ async def analyze_cv_enhanced(
     try:
         # Parse job requirements first
         from .models.cv_models import JobRequirements
-        from .services.chat_service import ChatService
         
-        chat_service_instance = ChatService()
-        job_requirements = chat_service_instance._parse_job_description(analysis_request.job_description)
+        job_requirements = chat_service._parse_job_description(analysis_request.job_description)
         
         # Convert to enhanced job requirements if needed
         if not isinstance(job_requirements, JobRequirements):
@@ -268,51 +347,14 @@ async def analyze_cv_enhanced(
         # Process CV with enhanced processor
         cv_data, comprehensive_score = await enhanced_cv_processor.process_enhanced_cv(
             analysis_request.cv_text, 
-            job_requirements
+            job_requirements,
+            use_cache=not no_cache
         )
         
-        # Convert comprehensive score to CVAnalysisResponse format
-        analysis_result = CVAnalysisResponse(
-            overall_score=comprehensive_score.overall_match_score,
-            skills_match=comprehensive_score.skills_match_score,
-            experience_match=comprehensive_score.experience_relevance_score,
-            detailed_analysis={
-                "seo_sem_score": comprehensive_score.seo_sem_score,
-                "martech_score": comprehensive_score.martech_operations_score,
-                "advanced_analytics_score": comprehensive_score.advanced_analytics_score,
-                "industry_specialization_score": comprehensive_score.industry_specialization_score,
-                "platform_leadership_score": comprehensive_score.platform_leadership_score,
-                "remote_capability_score": comprehensive_score.remote_capability_score,
-                "executive_readiness_score": comprehensive_score.executive_readiness_score,
-                "traditional_scores": {
-                    "technical_skills": comprehensive_score.technical_skills_score,
-                    "leadership": comprehensive_score.leadership_score,
-                    "education": comprehensive_score.education_score,
-                    "cultural_fit": comprehensive_score.cultural_fit_score
-                }
-            },
-            recommendations=comprehensive_score.suggested_interview_questions or [],
-            candidate_name=cv_data.name,
-            candidate_email=cv_data.contact.email if cv_data.contact else None,
-            extracted_skills=cv_data.skills,
-            enhanced_skills={
-                "seo_sem": cv_data.seo_sem_expertise,
-                "martech": cv_data.martech_proficiency,
-                "advanced_analytics": cv_data.advanced_analytics_skills,
-                "affiliate_marketing": cv_data.affiliate_marketing_experience,
-                "influencer_marketing": cv_data.influencer_marketing_experience,
-                "platform_leadership": cv_data.platform_leadership_experience,
-                "industry_expertise": cv_data.industry_vertical_expertise,
-                "remote_skills": cv_data.remote_collaboration_skills,
-                "executive_skills": cv_data.executive_capabilities,
-                "sales_marketing": cv_data.sales_marketing_integration_skills
-            }
-        )
-        
-        return analysis_result
+        return _enhanced_analysis_response(cv_data, comprehensive_score, job_requirements)
         
     except Exception as e:
-        logger.error(f"Error analyzing CV: {str(e)}")
+        log_sampled(logger, _analysis_error_bucket, logging.ERROR, "Error analyzing CV: %s", e)
         raise HTTPException(status_code=500, detail="Error analyzing CV")
 
 @app.post("/api/track-action", response_model=ActionTrackingResponse)
@@ -332,10 +374,11 @@ async def track_action(
         )
         
     except Exception as e:
-        logger.error(f"Error tracking action: {str(e)}")
+        logger.error("Error tracking action: %s", e)
         raise HTTPException(status_code=500, detail="Error tracking action")
 
 @app.get("/api/limitations/{feature}")
+@cached_response(ttl=30, maxsize=32)
 async def get_feature_limitation(feature: str):
     """Get limitation information for a premium feature"""
     
@@ -359,7 +402,7 @@ async def not_found_handler(request: Request, exc):
 @app.exception_handler(500)
 async def internal_error_handler(request: Request, exc):
     """Custom 500 handler"""
-    logger.error(f"Internal server error: {str(exc)}")
+    logger.error("Internal server error: %s", exc)
     return JSONResponse(
         status_code=500,
         content={"error": "Internal server error", "message": "An unexpected error occurred"}
@@ -367,6 +410,7 @@ async def internal_error_handler(request: Request, exc):
 
 # Additional endpoints for frontend integration
 @app.get("/api/config")
+@cached_response(ttl=60)
 async def get_app_config():
     """Get application configuration for frontend"""
     return {
@@ -388,15 +432,13 @@ async def get_app_config():
 
 # WebSocket endpoints for real-time updates (if available)
 if WEBSOCKET_AVAILABLE:
-    from fastapi import Query
-    
     @app.websocket("/ws/analysis")
     async def websocket_analysis(websocket: WebSocket, session_id: str = Query(...)):
         """WebSocket endpoint for real-time CV analysis updates"""
         await websocket_analysis_endpoint(websocket, session_id)
 
     @app.websocket("/ws/monitor")
-    async def websocket_monitor(websocket: WebSocket, admin_token: str = Query(...)):
+    async def websocket_monitor(websocket: WebSocket, admin_token: Optional[str] = Query(None)):
         """WebSocket endpoint for monitoring all sessions (admin only)"""
         await websocket_monitor_endpoint(websocket, admin_token)
 else:
@@ -404,13 +446,14 @@ else:
 
 # Real-time analysis endpoint (if v1.1 features available)
 if V11_AVAILABLE:
-    from fastapi import Query
+    from .services.websocket_manager import websocket_manager, SessionAbandonedError
     
     @app.post("/api/analyze-realtime", response_model=CVAnalysisResponse)
     async def analyze_cv_realtime(
         request: Request,
         analysis_request: CVAnalysisRequest,
-        session_id: str = Query(..., description="WebSocket session ID for real-time updates")
+        session_id: str = Query(..., description="WebSocket session ID for real-time updates"),
+        no_cache: bool = Query(False, description="Skip cached results and re-run the analysis")
     ):
         """Real-time CV analysis endpoint with WebSocket updates"""
         
@@ -422,10 +465,8 @@ if V11_AVAILABLE:
         try:
             # Parse job requirements
             from .models.cv_models import JobRequirements
-            from .services.chat_service import ChatService
             
-            chat_service_instance = ChatService()
-            job_requirements = chat_service_instance._parse_job_description(analysis_request.job_description)
+            job_requirements = chat_service._parse_job_description(analysis_request.job_description)
             
             # Convert to enhanced job requirements if needed
             if not isinstance(job_requirements, JobRequirements):
@@ -439,58 +480,30 @@ if V11_AVAILABLE:
             
             # Initialize V1.1 processor with session ID
             enhanced_processor_v11 = EnhancedCVProcessorV11(
-                api_key=settings.anthropic_api_key
+                api_key=settings.anthropic_api_key,
+                cache_ttl_hours=settings.cache_expiry_hours if settings.enable_skill_caching else 0,
+                model=settings.claude_model
             )
             
             # Process CV with real-time updates
-            cv_data, comprehensive_score = await enhanced_processor_v11.process_enhanced_cv_with_updates(
-                cv_text=analysis_request.cv_text,
-                job_requirements=job_requirements,
-                session_id=session_id
+            # (abandoned if the session's WebSocket clients stay disconnected)
+            cv_data, comprehensive_score = await websocket_manager.run_while_connected(
+                session_id,
+                enhanced_processor_v11.process_enhanced_cv_with_updates(
+                    cv_text=analysis_request.cv_text,
+                    job_requirements=job_requirements,
+                    session_id=session_id,
+                    use_cache=not no_cache
+                ),
+                grace_period=settings.realtime_reconnect_grace_seconds
             )
             
-            # Convert to API response format
-            analysis_result = CVAnalysisResponse(
-                overall_score=comprehensive_score.overall_match_score,
-                skills_match=comprehensive_score.skills_match_score,
-                experience_match=comprehensive_score.experience_relevance_score,
-                detailed_analysis={
-                    "seo_sem_score": comprehensive_score.seo_sem_score,
-                    "martech_score": comprehensive_score.martech_operations_score,
-                    "advanced_analytics_score": comprehensive_score.advanced_analytics_score,
-                "industry_specialization_score": comprehensive_score.industry_specialization_score,
-                "platform_leadership_score": comprehensive_score.platform_leadership_score,
-                "remote_capability_score": comprehensive_score.remote_capability_score,
-                "executive_readiness_score": comprehensive_score.executive_readiness_score,
-                "traditional_scores": {
-                    "technical_skills": comprehensive_score.technical_skills_score,
-                    "leadership": comprehensive_score.leadership_score,
-                    "education": comprehensive_score.education_score,
-                    "cultural_fit": comprehensive_score.cultural_fit_score
-                }
-            },
-            recommendations=comprehensive_score.suggested_interview_questions or [],
-            candidate_name=cv_data.name,
-            candidate_email=cv_data.contact.email if cv_data.contact else None,
-            extracted_skills=cv_data.skills,
-            enhanced_skills={
-                "seo_sem": cv_data.seo_sem_expertise,
-                "martech": cv_data.martech_proficiency,
-                "advanced_analytics": cv_data.advanced_analytics_skills,
-                "affiliate_marketing": cv_data.affiliate_marketing_experience,
-                "influencer_marketing": cv_data.influencer_marketing_experience,
-                "platform_leadership": cv_data.platform_leadership_experience,
-                "industry_expertise": cv_data.industry_vertical_expertise,
-                "remote_skills": cv_data.remote_collaboration_skills,
-                "executive_skills": cv_data.executive_capabilities,
-                "sales_marketing": cv_data.sales_marketing_integration_skills
-            }
-        )
-        
-            return analysis_result
+            return _enhanced_analysis_response(cv_data, comprehensive_score, job_requirements)
             
+        except SessionAbandonedError:
+            raise HTTPException(status_code=410, detail="Analysis cancelled: session has no listeners")
         except Exception as e:
-            logger.error(f"Error in real-time CV analysis: {str(e)}")
+            log_sampled(logger, _analysis_error_bucket, logging.ERROR, "Error in real-time CV analysis: %s", e)
             raise HTTPException(status_code=500, detail="Error analyzing CV")
 
 else:
@@ -499,7 +512,7 @@ else:
 @app.on_event("startup")
 async def startup_event():
     """Application startup event"""
-    logger.info(f"Starting {settings.app_name}")
+    logger.info("Starting %s", settings.app_name)
     
     # Start keep-alive service if available
     if keep_alive_service:
@@ -518,11 +531,16 @@ async def shutdown_event():
         logger.info("Keep-alive service stopped")
 
 if __name__ == "__main__":
+    import sys
     import uvicorn
     uvicorn.run(
         "app.main:app",
         host="0.0.0.0",
         port=8000,
         reload=settings.debug,
+        # uvloop is not available on Windows
+        loop="asyncio" if sys.platform == "win32" else "uvloop",
+        http="httptools",
+        ws="websockets",
         log_level=settings.log_level.lower()
     )
\ No newline at end of file
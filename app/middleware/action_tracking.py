@@ -1,6 +1,5 @@
 import logging
 from typing import Dict
-from datetime import datetime
 
 logger = logging.getLogger(__name__)
 
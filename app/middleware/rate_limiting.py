@@ -1,10 +1,17 @@
 import logging
-from typing import Dict
+from bisect import bisect_right
+from typing import Dict, Optional
 from datetime import datetime, timedelta
 from fastapi import Request
 
 logger = logging.getLogger(__name__)
 
+# Client addresses exempt from rate limiting (local development)
+_UNLIMITED_CLIENTS = frozenset(("127.0.0.1", "localhost", "unknown"))
+
+# How often record_call sweeps out clients with no calls left in the window
+_PRUNE_INTERVAL = timedelta(minutes=10)
+
 class RateLimiter:
     """Simple in-memory rate limiter for MVP"""
     
@@ -13,6 +20,7 @@ class RateLimiter:
         self.window_hours = window_hours
         self.calls: Dict[str, list] = {}
         self.contact_email = "andrew@automateengage.com"
+        self._next_prune = datetime.min
     
     def get_client_ip(self, request: Request) -> str:
         """Extract client IP address"""
@@ -29,28 +37,37 @@ class RateLimiter:
         
         return "unknown"
     
-    def is_rate_limited(self, client_ip: str) -> bool:
+    def is_rate_limited(self, client_ip: str, now: Optional[datetime] = None) -> bool:
         """Check if client has exceeded rate limit"""
-        now = datetime.now()
-        window_start = now - timedelta(hours=self.window_hours)
-        
-        if client_ip not in self.calls:
-            self.calls[client_ip] = []
+        calls = self.calls.get(client_ip)
+        if not calls:
+            return self.max_calls <= 0
         
-        # Clean old entries
-        self.calls[client_ip] = [
-            timestamp for timestamp in self.calls[client_ip] 
-            if timestamp > window_start
-        ]
+        # Clean old entries (calls are recorded in time order)
+        window_start = (now or datetime.now()) - timedelta(hours=self.window_hours)
+        expired = bisect_right(calls, window_start)
+        if expired:
+            del calls[:expired]
         
-        return len(self.calls[client_ip]) >= self.max_calls
+        return len(calls) >= self.max_calls
     
-    def record_call(self, client_ip: str):
+    def record_call(self, client_ip: str, now: Optional[datetime] = None):
         """Record a new API call"""
-        if client_ip not in self.calls:
-            self.calls[client_ip] = []
+        now = now or datetime.now()
+        if now >= self._next_prune:
+            self._prune_idle_clients(now - timedelta(hours=self.window_hours))
+            self._next_prune = now + _PRUNE_INTERVAL
         
-        self.calls[client_ip].append(datetime.now())
+        self.calls.setdefault(client_ip, []).append(now)
+    
+    def _prune_idle_clients(self, window_start: datetime):
+        """Forget clients whose most recent call is no longer in the window"""
+        idle = [
+            client_ip for client_ip, calls in self.calls.items()
+            if not calls or calls[-1] <= window_start
+        ]
+        for client_ip in idle:
+            del self.calls[client_ip]
     
     def get_rate_limit_response(self, client_ip: str) -> dict:
         """Get rate limit exceeded response"""
@@ -74,12 +91,14 @@ def check_rate_limit(request: Request):
     client_ip = rate_limiter.get_client_ip(request)
     
     # Skip rate limiting for local development
-    if client_ip in ["127.0.0.1", "localhost", "unknown"]:
+    if client_ip in _UNLIMITED_CLIENTS:
         return None
     
-    if rate_limiter.is_rate_limited(client_ip):
-        logger.warning(f"Rate limit exceeded for IP: {client_ip}")
+    # One clock read serves both the window check and the recorded call
+    now = datetime.now()
+    if rate_limiter.is_rate_limited(client_ip, now):
+        logger.warning("Rate limit exceeded for IP: %s", client_ip)
         return rate_limiter.get_rate_limit_response(client_ip)
     
-    rate_limiter.record_call(client_ip)
+    rate_limiter.record_call(client_ip, now)
     return None
\ No newline at end of file
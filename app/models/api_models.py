@@ -1,11 +1,11 @@
-from pydantic import BaseModel, Field, EmailStr
-from typing import Optional, Dict, Any, List
+from pydantic import BaseModel, Field
+from typing import Optional, Dict, Any, List, Literal
 from .cv_models import ComprehensiveScore
 
 class ChatMessage(BaseModel):
     """Chat message model"""
     content: str = Field(..., min_length=1, max_length=4000)
-    message_type: str = Field("text", pattern=r'^(text|file|system)$')
+    message_type: Literal["text", "file", "system"] = "text"
     file_name: Optional[str] = None
     file_type: Optional[str] = None
     timestamp: Optional[str] = None
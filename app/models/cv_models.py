@@ -1,23 +1,11 @@
-from pydantic import BaseModel, Field, EmailStr, validator
-from typing import Optional, List, Dict, Any
+from pydantic import BaseModel, Field, EmailStr, ValidationInfo, field_validator
+from typing import Optional, List, FrozenSet
 from datetime import datetime
 from enum import Enum
 
 # Import enhanced digital media skills
 try:
-    from .digital_media.enhanced_skills_model import (
-        EnhancedDigitalMediaSkills, 
-        SEOSEMSkills, 
-        MarTechStack, 
-        AdvancedAnalytics,
-        AffiliateMarketingSkills,
-        InfluencerMarketingSkills,
-        PlatformLeadershipSkills,
-        IndustryVerticals,
-        RemoteWorkSkills,
-        ExecutiveSkills,
-        SalesMarketingIntegration
-    )
+    from .digital_media.enhanced_skills_model import EnhancedDigitalMediaSkills
 except ImportError:
     # Fallback if enhanced skills not available
     EnhancedDigitalMediaSkills = None
@@ -110,7 +98,8 @@ class Experience(BaseModel):
     is_leadership_role: bool = False
     is_remote: bool = False
     
-    @validator('skills_used', 'technologies_used')
+    @field_validator('skills_used', 'technologies_used')
+    @classmethod
     def validate_skills(cls, v):
         return [skill.strip().lower() for skill in v if skill.strip()]
 
@@ -208,25 +197,40 @@ class CandidateCV(BaseModel):
     cultural_fit_indicators: List[str] = Field(default_factory=list)
     retention_probability_score: Optional[int] = Field(None, ge=1, le=10)
     
-    @validator('skills', pre=True)
+    @field_validator('skills', mode='before')
+    @classmethod
     def normalize_skills(cls, v):
         if isinstance(v, str):
             return [skill.strip().lower() for skill in v.split(',') if skill.strip()]
         return [skill.strip().lower() for skill in v if skill.strip()]
     
-    @validator('total_experience_years')
-    def calculate_experience(cls, v, values):
+    @field_validator('total_experience_years')
+    @classmethod
+    def calculate_experience(cls, v, info: ValidationInfo):
+        values = info.data
         if 'experience' in values and values['experience']:
             calculated = sum(exp.duration_months for exp in values['experience']) / 12
             return round(calculated, 1)
         return v
     
-    @validator('average_tenure_months')
-    def calculate_average_tenure(cls, v, values):
+    @field_validator('average_tenure_months')
+    @classmethod
+    def calculate_average_tenure(cls, v, info: ValidationInfo):
+        values = info.data
         if 'experience' in values and values['experience'] and len(values['experience']) > 0:
             total_months = sum(exp.duration_months for exp in values['experience'])
             return round(total_months / len(values['experience']), 1)
         return v
+    
+    @property
+    def skill_set(self) -> FrozenSet[str]:
+        """
+        Lowercased skills for set lookups
+
+        Built on each access; caching it on the instance would make otherwise
+        equal models compare unequal. Bind it once outside loops.
+        """
+        return frozenset(skill.lower() for skill in self.skills)
 
 class JobRequirements(BaseModel):
     """Enhanced job requirements with comprehensive criteria"""
@@ -269,9 +273,20 @@ class JobRequirements(BaseModel):
     salary_range_min: Optional[int] = None
     salary_range_max: Optional[int] = None
     
-    @validator('required_skills', 'preferred_skills', 'emerging_tech_requirements')
+    @field_validator('required_skills', 'preferred_skills', 'emerging_tech_requirements')
+    @classmethod
     def normalize_skills(cls, v):
         return [skill.strip().lower() for skill in v if skill.strip()]
+    
+    @property
+    def required_skill_set(self) -> FrozenSet[str]:
+        """Lowercased required skills for set lookups (built on each access)"""
+        return frozenset(skill.lower() for skill in self.required_skills)
+    
+    @property
+    def preferred_skill_set(self) -> FrozenSet[str]:
+        """Lowercased preferred skills for set lookups (built on each access)"""
+        return frozenset(skill.lower() for skill in self.preferred_skills)
 
 class ComprehensiveScore(BaseModel):
     """Comprehensive scoring breakdown following the framework"""
@@ -1,5 +1,5 @@
-from pydantic import BaseModel, Field, validator, HttpUrl
-from typing import Optional, List, Dict, Any
+from pydantic import BaseModel, Field, ValidationInfo, field_validator, HttpUrl
+from typing import Optional, List, Dict, Literal
 from datetime import datetime
 from enum import Enum
 
@@ -149,7 +149,7 @@ class PlatformExperienceDetail(BaseModel):
     """Detailed platform experience"""
     platform: PlatformExpertise
     years_experience: float = Field(ge=0.0, le=20.0)
-    proficiency_level: str = Field(..., regex=r'^(beginner|intermediate|advanced|expert)$')
+    proficiency_level: Literal["beginner", "intermediate", "advanced", "expert"]
     budget_managed_total: Optional[float] = None
     campaigns_managed: Optional[int] = None
     certifications: List[DigitalMediaCertification] = Field(default_factory=list)
@@ -258,8 +258,10 @@ class DigitalMediaCV(BaseModel):
     agency_experience_years: float = Field(0.0, ge=0.0)
     in_house_experience_years: float = Field(0.0, ge=0.0)
     
-    @validator('total_budget_managed_career')
-    def calculate_total_budget(cls, v, values):
+    @field_validator('total_budget_managed_career')
+    @classmethod
+    def calculate_total_budget(cls, v, info: ValidationInfo):
+        values = info.data
         if 'experience' in values and values['experience']:
             total = sum(exp.total_budget_managed or 0 for exp in values['experience'])
             return total if total > 0 else None
@@ -338,6 +340,6 @@ class DigitalMediaScore(BaseModel):
     unfamiliar_with_privacy_changes: bool = False
     
     # Recommendations
-    recommendation: str = Field(..., regex=r'^(strong_hire|hire|maybe|pass|strong_pass)$')
+    recommendation: Literal["strong_hire", "hire", "maybe", "pass", "strong_pass"]
     interview_focus_areas: List[str] = Field(default_factory=list)
     skill_development_suggestions: List[str] = Field(default_factory=list)
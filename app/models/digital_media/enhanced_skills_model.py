@@ -1,7 +1,7 @@
 """Enhanced Digital Media Skills Model - Based on Market Analysis"""
 
 from pydantic import BaseModel, Field
-from typing import List, Optional
+from typing import List
 from enum import Enum
 
 class SEOSEMSkills(str, Enum):
@@ -231,3 +231,11 @@ INDUSTRY_EXPERTISE_INDICATORS = {
         "exclusivity marketing", "high net worth", "luxury customer journey"
     ]
 }
+
+# Executive-level capability indicators
+EXECUTIVE_INDICATORS = [
+    "p&l responsibility", "profit and loss", "budget management",
+    "strategic planning", "board presentation", "stakeholder management",
+    "organizational development", "team leadership", "culture transformation",
+    "market expansion", "business development", "investor relations"
+]
@@ -1,12 +1,12 @@
 import logging
 import asyncio
-from typing import Dict, Any, List, Optional
-import anthropic
-from ..config import settings
+from typing import Dict, Any, List
+from ..config import get_settings
 from ..models.api_models import ChatMessage, ChatResponse
-from ..models.cv_models import CandidateCV, JobRequirements
+from ..models.cv_models import JobRequirements
 from ..services.cv_processor import CVProcessor
 from ..services.mvp_limitations import MVPLimitationHandler
+from ..utils.anthropic_client import get_anthropic_client
 
 logger = logging.getLogger(__name__)
 
@@ -14,7 +14,7 @@ class ChatService:
     """Chat service with Claude integration for CV analysis"""
     
     def __init__(self):
-        self.client = anthropic.Anthropic(api_key=settings.anthropic_api_key)
+        self.client = get_anthropic_client(get_settings().anthropic_api_key)
         self.cv_processor = CVProcessor()
         self.limitation_handler = MVPLimitationHandler()
         
@@ -103,7 +103,7 @@ Always provide a confidence score (1-10) for your assessment and explain your re
         self.conversations[session_id].append({
             "role": "assistant",
             "content": f"CV uploaded and analyzed for {cv_data.name}",
-            "cv_data": cv_data.dict()
+            "cv_data": cv_data.model_dump()
         })
         
         # Generate response
@@ -123,7 +123,7 @@ What would you like to do next?"""
         return ChatResponse(
             content=response_content,
             message_type="text",
-            metadata={"cv_data": cv_data.dict()}
+            metadata={"cv_data": cv_data.model_dump()}
         )
     
     async def _handle_text_message(self, message: ChatMessage, session_id: str) -> ChatResponse:
@@ -269,7 +269,7 @@ Would you like me to provide more detailed analysis or suggest next steps?"""
             return ChatResponse(
                 content=response_content,
                 message_type="text",
-                metadata={"analysis_result": analysis_result.dict()}
+                metadata={"analysis_result": analysis_result.model_dump()}
             )
             
         except Exception as e:
@@ -1,27 +1,111 @@
+from __future__ import annotations
+
 import logging
 import re
-from typing import Dict, Any, List, Optional
-from ..models.cv_models import CandidateCV, JobRequirements, ContactInfo, Education, Experience
+from types import MappingProxyType
+from typing import TYPE_CHECKING, List, Mapping, Optional, Tuple
+from ..models.cv_models import CandidateCV, ContactInfo, Education, Experience
 from ..models.api_models import CVAnalysisResponse
 
+if TYPE_CHECKING:
+    from ..models.cv_models import JobRequirements
+
 logger = logging.getLogger(__name__)
 
+# Known skills by category, all lowercase
+_SKILL_KEYWORDS: Mapping[str, Tuple[str, ...]] = MappingProxyType({
+    'programming': ('python', 'java', 'javascript', 'typescript', 'c++', 'c#', 'php', 'ruby', 'go', 'rust', 'swift', 'kotlin', 'scala', 'r', 'matlab'),
+    'web': ('html', 'css', 'react', 'angular', 'vue', 'node.js', 'express', 'django', 'flask', 'fastapi', 'spring', 'laravel', 'rails', 'nextjs', 'nuxt'),
+    'database': ('sql', 'mysql', 'postgresql', 'mongodb', 'redis', 'elasticsearch', 'oracle', 'sqlite', 'cassandra', 'dynamodb', 'neo4j'),
+    'cloud': ('aws', 'azure', 'gcp', 'google cloud', 'docker', 'kubernetes', 'terraform', 'ansible', 'jenkins', 'github actions', 'gitlab ci'),
+    'tools': ('git', 'jira', 'confluence', 'slack', 'figma', 'adobe', 'photoshop', 'sketch', 'linux', 'windows', 'macos'),
+    'data_science': ('pandas', 'numpy', 'scikit-learn', 'tensorflow', 'pytorch', 'keras', 'tableau', 'power bi', 'excel', 'spark'),
+    'mobile': ('react native', 'flutter', 'swift', 'kotlin', 'ionic', 'xamarin', 'android', 'ios'),
+    'testing': ('jest', 'pytest', 'selenium', 'cypress', 'junit', 'mocha', 'testing', 'unit test', 'integration test'),
+    'security': ('cybersecurity', 'penetration testing', 'ethical hacking', 'security', 'ssl', 'oauth', 'jwt'),
+    'management': ('project management', 'agile', 'scrum', 'kanban', 'team lead', 'leadership', 'management')
+})
+# Distinct skills across categories, checked once each per CV
+_ALL_SKILL_KEYWORDS = frozenset(
+    skill for skills in _SKILL_KEYWORDS.values() for skill in skills
+)
+
+# Extraction patterns, compiled once at import
+_NAME_PATTERNS = tuple(re.compile(pattern, re.MULTILINE) for pattern in (
+    r'(?:Name|Full Name|Candidate Name)[:\s]+([A-Za-z\s\-\'\.]+)',
+    r'^([A-Z][a-z]+(?:\s+[A-Z][a-z]+){1,3})\s*$',  # 2-4 names at start of line
+    r'([A-Z][A-Z\s]+[A-Z])',  # ALL CAPS names
+    r'([A-Z][a-z]+\s+[A-Z]\.?\s+[A-Z][a-z]+)',  # First Middle Last
+    r'([A-Z][a-z]+(?:\s+[a-z]+)?\s+[A-Z][a-z]+)',  # First von Last
+))
+_NON_NAME_CHARS = re.compile(r'[@\+\d]')
+_WHITESPACE = re.compile(r'\s+')
+_NAME_PREFIX = re.compile(r'^(Mr|Ms|Mrs|Dr|Prof)\.?\s+', re.IGNORECASE)
+_LEADING_BULLETS = re.compile(r'^[-•·\s]+')
+
+_EMAIL = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b')
+_PHONE = re.compile(r'[\+]?[1-9]?[0-9]{7,14}')
+_LINKEDIN = re.compile(r'linkedin\.com/in/[A-Za-z0-9\-]+')
+_LOCATION_PATTERNS = tuple(re.compile(pattern) for pattern in (
+    r'Location[:\s]+([A-Za-z\s,]+)',
+    r'Address[:\s]+([A-Za-z\s,]+)',
+    r'([A-Z][a-z]+,\s*[A-Z]{2})',
+    r'([A-Z][a-z]+\s*,\s*[A-Z][a-z]+)'
+))
+
+_SKILLS_SECTION = re.compile(
+    r'(?:skills?|technologies?|technical skills?)[:\s]+(.*?)(?:\n\s*\n|\n[A-Z]|$)',
+    re.IGNORECASE | re.DOTALL
+)
+_SKILL_DELIMITERS = re.compile(r'[,;•\-\n\t]+')
+
+_EDUCATION_SECTION = re.compile(
+    r'(?:education|academic|qualifications?)[:\s]+(.*?)(?:\n\s*\n|\n[A-Z]|$)',
+    re.IGNORECASE | re.DOTALL
+)
+_DEGREE_PATTERNS = tuple(re.compile(pattern, re.IGNORECASE) for pattern in (
+    r'(Bachelor|Master|PhD|MBA|BS|MS|BA|MA)[^,\n]+(?:,|\n|\s+)(.*?)(?:\d{4}|\n|$)',
+    r'([A-Za-z\s]+(?:degree|certification))[^,\n]*(?:,|\n|\s+)(.*?)(?:\d{4}|\n|$)'
+))
+
+_EXPERIENCE_SECTIONS = tuple(re.compile(pattern, re.IGNORECASE | re.DOTALL) for pattern in (
+    r'(?:experience|employment|work history|professional experience|career)[:\s]+(.*?)(?=\n\s*(?:education|skills|projects|qualifications|references)|$)',
+    r'(?:work experience|professional background)[:\s]+(.*?)(?=\n\s*(?:education|skills|projects|qualifications|references)|$)'
+))
+# Enhanced patterns for different CV formats
+_JOB_PATTERNS = tuple(re.compile(pattern, re.IGNORECASE | re.MULTILINE) for pattern in (
+    # Standard format: Title, Company, Dates
+    r'([A-Za-z\s&,.-]{10,60})\n.*?([A-Za-z\s&,.-]{2,40})\n.*?(\d{1,2}\/\d{4}|[A-Za-z]{3,9}\s+\d{4}).*?(?:[-–]|to|present|\n).*?(\d{1,2}\/\d{4}|[A-Za-z]{3,9}\s+\d{4}|present)',
+    # Inline format: Title at Company (Date - Date)
+    r'([A-Za-z\s&,.-]{5,50})\s+(?:at|@|\|)\s+([A-Za-z\s&,.-]{2,40}).*?(\d{1,2}\/\d{4}|[A-Za-z]{3,9}\s+\d{4}).*?[-–].*?(\d{1,2}\/\d{4}|[A-Za-z]{3,9}\s+\d{4}|present)',
+    # Years only format: Title at Company (2020-2023)
+    r'([A-Za-z\s&,.-]{5,50})\s+(?:at|@|\|)\s+([A-Za-z\s&,.-]{2,40}).*?(\d{4}).*?[-–].*?(\d{4}|present)',
+    # Duration format: Title at Company - 2 years 3 months
+    r'([A-Za-z\s&,.-]{5,50})\s+(?:at|@|\|)\s+([A-Za-z\s&,.-]{2,40}).*?(\d{1,2})\s*(?:years?|yrs?)(?:\s*(\d{1,2})\s*(?:months?|mos?))?'
+))
+_INVALID_JOB_PATTERNS = tuple(re.compile(pattern) for pattern in (
+    r'^\d+$',  # Just numbers
+    r'^[^a-zA-Z]*$',  # No letters
+    r'email|phone|address|linkedin',  # Contact info
+))
+_TOTAL_EXPERIENCE_PATTERNS = tuple(re.compile(pattern, re.IGNORECASE) for pattern in (
+    r'(\d+)\+?\s*(?:years?|yrs?)\s*(?:of\s*)?(?:experience|exp)',
+    r'(?:experience|exp).*?(\d+)\+?\s*(?:years?|yrs?)',
+    r'(\d+)\s*(?:years?|yrs?)\s*(?:experience|exp)'
+))
+
+_SUMMARY_PATTERNS = tuple(re.compile(pattern, re.IGNORECASE | re.DOTALL) for pattern in (
+    r'(?:summary|objective|profile|about)[:\s]+(.*?)(?:\n\s*\n|\n[A-Z]|$)',
+    r'(?:professional summary|career objective)[:\s]+(.*?)(?:\n\s*\n|\n[A-Z]|$)'
+))
+_YEAR = re.compile(r'\b(19|20)\d{2}\b')
+
+
 class CVProcessor:
     """CV processing and analysis service"""
     
     def __init__(self):
-        self.skill_keywords = {
-            'programming': ['python', 'java', 'javascript', 'typescript', 'c++', 'c#', 'php', 'ruby', 'go', 'rust', 'swift', 'kotlin', 'scala', 'r', 'matlab'],
-            'web': ['html', 'css', 'react', 'angular', 'vue', 'node.js', 'express', 'django', 'flask', 'fastapi', 'spring', 'laravel', 'rails', 'nextjs', 'nuxt'],
-            'database': ['sql', 'mysql', 'postgresql', 'mongodb', 'redis', 'elasticsearch', 'oracle', 'sqlite', 'cassandra', 'dynamodb', 'neo4j'],
-            'cloud': ['aws', 'azure', 'gcp', 'google cloud', 'docker', 'kubernetes', 'terraform', 'ansible', 'jenkins', 'github actions', 'gitlab ci'],
-            'tools': ['git', 'jira', 'confluence', 'slack', 'figma', 'adobe', 'photoshop', 'sketch', 'linux', 'windows', 'macos'],
-            'data_science': ['pandas', 'numpy', 'scikit-learn', 'tensorflow', 'pytorch', 'keras', 'tableau', 'power bi', 'excel', 'spark'],
-            'mobile': ['react native', 'flutter', 'swift', 'kotlin', 'ionic', 'xamarin', 'android', 'ios'],
-            'testing': ['jest', 'pytest', 'selenium', 'cypress', 'junit', 'mocha', 'testing', 'unit test', 'integration test'],
-            'security': ['cybersecurity', 'penetration testing', 'ethical hacking', 'security', 'ssl', 'oauth', 'jwt'],
-            'management': ['project management', 'agile', 'scrum', 'kanban', 'team lead', 'leadership', 'management']
-        }
+        self.skill_keywords = _SKILL_KEYWORDS
     
     def extract_cv_data(self, cv_text: str) -> CandidateCV:
         """Extract structured data from CV text"""
@@ -74,16 +158,8 @@ class CVProcessor:
         lines = text.strip().split('\n')
         
         # Enhanced name patterns with more variations
-        name_patterns = [
-            r'(?:Name|Full Name|Candidate Name)[:\s]+([A-Za-z\s\-\'\.]+)',
-            r'^([A-Z][a-z]+(?:\s+[A-Z][a-z]+){1,3})\s*$',  # 2-4 names at start of line
-            r'([A-Z][A-Z\s]+[A-Z])',  # ALL CAPS names
-            r'([A-Z][a-z]+\s+[A-Z]\.?\s+[A-Z][a-z]+)',  # First Middle Last
-            r'([A-Z][a-z]+(?:\s+[a-z]+)?\s+[A-Z][a-z]+)',  # First von Last
-        ]
-        
-        for pattern in name_patterns:
-            match = re.search(pattern, text, re.MULTILINE)
+        for pattern in _NAME_PATTERNS:
+            match = pattern.search(text)
             if match:
                 name = match.group(1).strip()
                 # Validate name (not too long, contains alphabetic chars)
@@ -94,7 +170,7 @@ class CVProcessor:
         for line in lines[:8]:
             line = line.strip()
             # Skip empty lines, emails, phones, addresses
-            if (line and not re.search(r'[@\+\d]', line) and 
+            if (line and not _NON_NAME_CHARS.search(line) and 
                 len(line.split()) <= 4 and 
                 all(word.replace('-', '').replace("'", "").replace('.', '').isalpha() for word in line.split())):
                 if len(line) > 4:  # Avoid single letters or very short strings
@@ -105,8 +181,8 @@ class CVProcessor:
     def _clean_name(self, name: str) -> str:
         """Clean and format extracted name"""
         # Remove extra whitespace and common prefixes/suffixes
-        name = re.sub(r'\s+', ' ', name.strip())
-        name = re.sub(r'^(Mr|Ms|Mrs|Dr|Prof)\.?\s+', '', name, flags=re.IGNORECASE)
+        name = _WHITESPACE.sub(' ', name.strip())
+        name = _NAME_PREFIX.sub('', name)
         
         # Title case
         words = []
@@ -120,13 +196,9 @@ class CVProcessor:
     
     def _extract_contact_info(self, text: str) -> ContactInfo:
         """Extract contact information"""
-        email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-        phone_pattern = r'[\+]?[1-9]?[0-9]{7,14}'
-        linkedin_pattern = r'linkedin\.com/in/[A-Za-z0-9\-]+'
-        
-        email_match = re.search(email_pattern, text)
-        phone_match = re.search(phone_pattern, text)
-        linkedin_match = re.search(linkedin_pattern, text)
+        email_match = _EMAIL.search(text)
+        phone_match = _PHONE.search(text)
+        linkedin_match = _LINKEDIN.search(text)
         
         return ContactInfo(
             email=email_match.group() if email_match else None,
@@ -137,15 +209,8 @@ class CVProcessor:
     
     def _extract_location(self, text: str) -> Optional[str]:
         """Extract location information"""
-        location_patterns = [
-            r'Location[:\s]+([A-Za-z\s,]+)',
-            r'Address[:\s]+([A-Za-z\s,]+)',
-            r'([A-Z][a-z]+,\s*[A-Z]{2})',
-            r'([A-Z][a-z]+\s*,\s*[A-Z][a-z]+)'
-        ]
-        
-        for pattern in location_patterns:
-            match = re.search(pattern, text)
+        for pattern in _LOCATION_PATTERNS:
+            match = pattern.search(text)
             if match:
                 return match.group(1).strip()
         
@@ -154,22 +219,17 @@ class CVProcessor:
     def _extract_skills(self, text: str) -> List[str]:
         """Extract skills from CV text"""
         text_lower = text.lower()
-        found_skills = set()
         
         # Extract from all skill categories
-        for category, skills in self.skill_keywords.items():
-            for skill in skills:
-                if skill.lower() in text_lower:
-                    found_skills.add(skill.lower())
+        found_skills = {skill for skill in _ALL_SKILL_KEYWORDS if skill in text_lower}
         
         # Look for skills sections
-        skills_section_pattern = r'(?:skills?|technologies?|technical skills?)[:\s]+(.*?)(?:\n\s*\n|\n[A-Z]|$)'
-        skills_match = re.search(skills_section_pattern, text, re.IGNORECASE | re.DOTALL)
+        skills_match = _SKILLS_SECTION.search(text)
         
         if skills_match:
             skills_text = skills_match.group(1)
             # Split by common delimiters
-            skills_list = re.split(r'[,;•\-\n\t]+', skills_text)
+            skills_list = _SKILL_DELIMITERS.split(skills_text)
             for skill in skills_list:
                 skill = skill.strip()
                 if skill and len(skill) < 30:  # Reasonable skill name length
@@ -182,20 +242,14 @@ class CVProcessor:
         education_list = []
         
         # Look for education section
-        education_pattern = r'(?:education|academic|qualifications?)[:\s]+(.*?)(?:\n\s*\n|\n[A-Z]|$)'
-        education_match = re.search(education_pattern, text, re.IGNORECASE | re.DOTALL)
+        education_match = _EDUCATION_SECTION.search(text)
         
         if education_match:
             education_text = education_match.group(1)
             
             # Extract degree and institution patterns
-            degree_patterns = [
-                r'(Bachelor|Master|PhD|MBA|BS|MS|BA|MA)[^,\n]+(?:,|\n|\s+)(.*?)(?:\d{4}|\n|$)',
-                r'([A-Za-z\s]+(?:degree|certification))[^,\n]*(?:,|\n|\s+)(.*?)(?:\d{4}|\n|$)'
-            ]
-            
-            for pattern in degree_patterns:
-                matches = re.finditer(pattern, education_text, re.IGNORECASE)
+            for pattern in _DEGREE_PATTERNS:
+                matches = pattern.finditer(education_text)
                 for match in matches:
                     degree = match.group(1).strip()
                     institution = match.group(2).strip()
@@ -214,14 +268,9 @@ class CVProcessor:
         experience_list = []
         
         # Look for experience section first
-        experience_sections = [
-            r'(?:experience|employment|work history|professional experience|career)[:\s]+(.*?)(?=\n\s*(?:education|skills|projects|qualifications|references)|$)',
-            r'(?:work experience|professional background)[:\s]+(.*?)(?=\n\s*(?:education|skills|projects|qualifications|references)|$)'
-        ]
-        
         experience_text = ""
-        for pattern in experience_sections:
-            match = re.search(pattern, text, re.IGNORECASE | re.DOTALL)
+        for pattern in _EXPERIENCE_SECTIONS:
+            match = pattern.search(text)
             if match:
                 experience_text = match.group(1)
                 break
@@ -230,20 +279,8 @@ class CVProcessor:
             # Fallback: look for common job patterns throughout the text
             experience_text = text
         
-        # Enhanced patterns for different CV formats
-        job_patterns = [
-            # Standard format: Title, Company, Dates
-            r'([A-Za-z\s&,.-]{10,60})\n.*?([A-Za-z\s&,.-]{2,40})\n.*?(\d{1,2}\/\d{4}|[A-Za-z]{3,9}\s+\d{4}).*?(?:[-–]|to|present|\n).*?(\d{1,2}\/\d{4}|[A-Za-z]{3,9}\s+\d{4}|present)',
-            # Inline format: Title at Company (Date - Date)
-            r'([A-Za-z\s&,.-]{5,50})\s+(?:at|@|\|)\s+([A-Za-z\s&,.-]{2,40}).*?(\d{1,2}\/\d{4}|[A-Za-z]{3,9}\s+\d{4}).*?[-–].*?(\d{1,2}\/\d{4}|[A-Za-z]{3,9}\s+\d{4}|present)',
-            # Years only format: Title at Company (2020-2023)
-            r'([A-Za-z\s&,.-]{5,50})\s+(?:at|@|\|)\s+([A-Za-z\s&,.-]{2,40}).*?(\d{4}).*?[-–].*?(\d{4}|present)',
-            # Duration format: Title at Company - 2 years 3 months
-            r'([A-Za-z\s&,.-]{5,50})\s+(?:at|@|\|)\s+([A-Za-z\s&,.-]{2,40}).*?(\d{1,2})\s*(?:years?|yrs?)(?:\s*(\d{1,2})\s*(?:months?|mos?))?'
-        ]
-        
-        for pattern in job_patterns:
-            matches = re.finditer(pattern, experience_text, re.IGNORECASE | re.MULTILINE)
+        for pattern in _JOB_PATTERNS:
+            matches = pattern.finditer(experience_text)
             
             for match in matches:
                 title = self._clean_text(match.group(1))
@@ -276,21 +313,17 @@ class CVProcessor:
         if not text:
             return ""
         # Remove extra whitespace and common prefixes
-        text = re.sub(r'\s+', ' ', text.strip())
-        text = re.sub(r'^[-•·\s]+', '', text)
+        text = _WHITESPACE.sub(' ', text.strip())
+        text = _LEADING_BULLETS.sub('', text)
         return text
     
     def _is_valid_job_info(self, title: str, company: str) -> bool:
         """Validate if extracted job info seems legitimate"""
         # Skip if too short or contains invalid patterns
-        invalid_patterns = [
-            r'^\d+$',  # Just numbers
-            r'^[^a-zA-Z]*$',  # No letters
-            r'email|phone|address|linkedin',  # Contact info
-        ]
-        
-        for pattern in invalid_patterns:
-            if re.search(pattern, title.lower()) or re.search(pattern, company.lower()):
+        title_lower = title.lower()
+        company_lower = company.lower()
+        for pattern in _INVALID_JOB_PATTERNS:
+            if pattern.search(title_lower) or pattern.search(company_lower):
                 return False
         
         return len(title) >= 3 and len(company) >= 2
@@ -335,7 +368,7 @@ class CVProcessor:
             return None
         
         # Look for 4-digit year
-        year_match = re.search(r'\b(19|20)\d{2}\b', date_str)
+        year_match = _YEAR.search(date_str)
         if year_match:
             year = int(year_match.group())
             if 1980 <= year <= 2030:  # Reasonable range
@@ -348,14 +381,8 @@ class CVProcessor:
         experience_list = []
         
         # Look for any mention of years of experience
-        total_exp_patterns = [
-            r'(\d+)\+?\s*(?:years?|yrs?)\s*(?:of\s*)?(?:experience|exp)',
-            r'(?:experience|exp).*?(\d+)\+?\s*(?:years?|yrs?)',
-            r'(\d+)\s*(?:years?|yrs?)\s*(?:experience|exp)'
-        ]
-        
-        for pattern in total_exp_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
+        for pattern in _TOTAL_EXPERIENCE_PATTERNS:
+            match = pattern.search(text)
             if match:
                 years = int(match.group(1))
                 experience_list.append(Experience(
@@ -371,13 +398,8 @@ class CVProcessor:
     
     def _extract_summary(self, text: str) -> Optional[str]:
         """Extract summary or objective"""
-        summary_patterns = [
-            r'(?:summary|objective|profile|about)[:\s]+(.*?)(?:\n\s*\n|\n[A-Z]|$)',
-            r'(?:professional summary|career objective)[:\s]+(.*?)(?:\n\s*\n|\n[A-Z]|$)'
-        ]
-        
-        for pattern in summary_patterns:
-            match = re.search(pattern, text, re.IGNORECASE | re.DOTALL)
+        for pattern in _SUMMARY_PATTERNS:
+            match = pattern.search(text)
             if match:
                 summary = match.group(1).strip()
                 if len(summary) > 50:  # Ensure it's a meaningful summary
@@ -387,8 +409,7 @@ class CVProcessor:
     
     def _extract_year(self, text: str) -> Optional[int]:
         """Extract year from text"""
-        year_pattern = r'\b(19|20)\d{2}\b'
-        match = re.search(year_pattern, text)
+        match = _YEAR.search(text)
         if match:
             year = int(match.group())
             if 1950 <= year <= 2030:
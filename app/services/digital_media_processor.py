@@ -1,15 +1,14 @@
 import logging
-from typing import Dict, Any, List, Optional
-from anthropic import Anthropic
+from typing import Dict, List, Optional
 import json
 import re
-from urllib.parse import urlparse
 
 from ..models.digital_media.dm_models import (
     DigitalMediaCV, DigitalMediaJobRequirements, DigitalMediaScore,
-    DigitalMediaRole, PlatformExpertise, CreativeTools, AnalyticsTools,
+    PlatformExpertise, CreativeTools,
     AgencyTier, CampaignType, DigitalMediaPortfolio, CampaignPerformance
 )
+from ..utils.anthropic_client import get_anthropic_client
 
 logger = logging.getLogger(__name__)
 
@@ -17,7 +16,7 @@ class DigitalMediaCVProcessor:
     """Specialized CV processor for digital media recruiting"""
     
     def __init__(self, api_key: str):
-        self.client = Anthropic(api_key=api_key)
+        self.client = get_anthropic_client(api_key)
         self.model = "claude-3-sonnet-20240229"
         
         # Digital media specific keywords and patterns
@@ -326,16 +325,20 @@ class DigitalMediaCVProcessor:
         if cv_data.portfolio.personal_website:
             score += 20.0
         
-        # Quality scores (60 points)
-        quality_scores = [
+        # Quality scores (60 points) - single pass running mean over rated scores
+        quality_total = 0.0
+        quality_count = 0
+        for quality in (
             cv_data.portfolio.visual_design_quality,
             cv_data.portfolio.strategic_thinking_quality,
             cv_data.portfolio.innovation_score
-        ]
+        ):
+            if quality is not None:
+                quality_total += quality
+                quality_count += 1
         
-        valid_scores = [s for s in quality_scores if s is not None]
-        if valid_scores:
-            avg_quality = sum(valid_scores) / len(valid_scores)
+        if quality_count:
+            avg_quality = quality_total / quality_count
             score += (avg_quality / 10) * 60
         
         return min(score, 100.0)
@@ -1,31 +1,255 @@
 """Enhanced CV Processor with New Skills Categories"""
 
+from __future__ import annotations
+
+import asyncio
 import logging
-from typing import Dict, Any, List, Optional
-from anthropic import Anthropic
+from hashlib import blake2b
+from typing import TYPE_CHECKING, Dict, FrozenSet, List
 import json
-import re
-from urllib.parse import urlparse
+import sys
 
-from ..models.cv_models import CandidateCV, JobRequirements, ComprehensiveScore
+from ..models.cv_models import CandidateCV, ComprehensiveScore
 from ..models.digital_media.enhanced_skills_model import (
     ENHANCED_KEYWORDS, 
     INDUSTRY_EXPERTISE_INDICATORS,
+    EXECUTIVE_INDICATORS,
     EnhancedScoringWeights
 )
+from ..utils.anthropic_client import get_anthropic_client
+from ..utils.log_sampling import TokenBucket, log_sampled
+from ..utils.response_cache import TTLCache
+
+if TYPE_CHECKING:
+    from ..models.cv_models import JobRequirements
 
 logger = logging.getLogger(__name__)
 
+# Caps failure logging when Claude or parsing keeps failing
+_error_log_bucket = TokenBucket(rate=10, burst=20)
+
+
+def _intern_keyword_map(mapping: Dict[str, List[str]]) -> Dict[str, List[str]]:
+    """Intern category keys and keywords so lookups compare by identity"""
+    return {
+        sys.intern(category): [sys.intern(keyword) for keyword in keywords]
+        for category, keywords in mapping.items()
+    }
+
+
+# Built once at import and shared by every processor instance
+_ENHANCED_KEYWORDS = _intern_keyword_map(ENHANCED_KEYWORDS)
+_INDUSTRY_INDICATORS = _intern_keyword_map(INDUSTRY_EXPERTISE_INDICATORS)
+_EXECUTIVE_INDICATORS = [sys.intern(indicator) for indicator in EXECUTIVE_INDICATORS]
+# Skill, industry and executive keywords, all found by the same scan
+_ALL_KEYWORDS = frozenset(
+    [keyword for keywords in _ENHANCED_KEYWORDS.values() for keyword in keywords]
+    + [indicator for indicators in _INDUSTRY_INDICATORS.values() for indicator in indicators]
+    + _EXECUTIVE_INDICATORS
+)
+
+
+# Keyword hits of recently scanned CVs, keyed by a digest rather than the CV text
+_keyword_hits_cache = TTLCache(ttl=60, maxsize=16)
+
+
+def _keyword_hits(cv_text_lower: str) -> FrozenSet[str]:
+    """
+    Every known keyword occurring in the text
+
+    Cached so the skill, industry and executive lookups for one CV share a
+    single pass over the keyword set.
+    """
+    key = blake2b(cv_text_lower.encode("utf-8"), digest_size=16).digest()
+    found, hits = _keyword_hits_cache.get(key)
+    if not found:
+        hits = frozenset(keyword for keyword in _ALL_KEYWORDS if keyword in cv_text_lower)
+        _keyword_hits_cache.set(key, hits)
+    return hits
+
+
+# Processed (cv_data, score) results shared across processor instances
+_result_cache = TTLCache(ttl=24 * 3600, maxsize=256)
+
+
+# Claude CV parses in flight, so concurrent requests for the same CV share one call
+_inflight_parses: Dict[str, "asyncio.Future[CandidateCV]"] = {}
+
+
+def _normalized_cv_bytes(cv_text: str) -> bytes:
+    """CV text with whitespace runs collapsed, as hashed for cache keys"""
+    return " ".join(cv_text.split()).encode("utf-8")
+
+
+def result_cache_key(cv_text: str, job_requirements: JobRequirements) -> str:
+    """Stable hash of whitespace-normalized CV text and the job requirements"""
+    digest = blake2b(digest_size=16)
+    digest.update(_normalized_cv_bytes(cv_text))
+    digest.update(b"\0")
+    digest.update(job_requirements.model_dump_json().encode("utf-8"))
+    return digest.hexdigest()
+
+
+# Model used for CV parsing; must support prompt caching
+DEFAULT_MODEL = "claude-sonnet-4-5-20250929"
+
+# Parsing instructions shared by every CV; sent as a cached system prompt so
+# repeat parses only pay full price for the CV text
+_PARSING_INSTRUCTIONS = """\
+Parse this CV for a digital media professional and extract comprehensive information including NEW SKILL CATEGORIES identified from market analysis.
+Return ONLY valid JSON that matches the enhanced CandidateCV schema:
+
+{
+    "name": "string",
+    "contact": {
+        "email": "string or null",
+        "phone": "string or null",
+        "linkedin": "string or null",
+        "location": "string or null",
+        "portfolio": "string or null"
+    },
+    "experience": [{
+        "title": "string",
+        "company": "string",
+        "duration_months": "number",
+        "description": "string or null",
+        "skills_used": ["skill1", "skill2"],
+        "start_date": "YYYY-MM-DD or null",
+        "end_date": "YYYY-MM-DD or null",
+        "achievements": [{
+            "title": "string",
+            "description": "string",
+            "quantifiable_result": "string or null"
+        }]
+    }],
+    "skills": ["skill1", "skill2"],
+    "detailed_skills": [{
+        "skill_name": "string",
+        "proficiency_level": "beginner|intermediate|advanced|expert",
+        "years_experience": "number or null",
+        "skill_category": "SEO|MarTech|Analytics|etc or null",
+        "platform_specific": "Meta|Google|TikTok|etc or null",
+        "industry_specific": "Healthcare|FinTech|etc or null"
+    }],
+
+    // NEW ENHANCED SKILL CATEGORIES:
+    "seo_sem_expertise": [
+        "core web vitals", "schema markup", "technical seo", "local seo",
+        "google search console", "site speed optimization", "keyword research"
+    ],
+    "martech_proficiency": [
+        "salesforce marketing cloud", "hubspot", "marketo", "pardot",
+        "marketing automation", "lead scoring", "crm integration"
+    ],
+    "advanced_analytics_skills": [
+        "sql", "python", "tableau", "power bi", "google analytics 4",
+        "predictive modeling", "business intelligence", "data visualization"
+    ],
+    "affiliate_marketing_experience": [
+        "commission tracking", "affiliate networks", "performance partnerships",
+        "affiliate attribution", "partner management"
+    ],
+    "influencer_marketing_experience": [
+        "creator management", "influencer roi", "ftc compliance",
+        "micro influencers", "influencer contracts"
+    ],
+    "platform_leadership_experience": [
+        "platform strategy", "head of platform", "platform optimization",
+        "cross-platform integration", "platform training"
+    ],
+    "industry_vertical_expertise": [
+        "healthcare", "financial services", "b2b saas", "ecommerce",
+        "luxury brands", "automotive", "travel"
+    ],
+    "remote_collaboration_skills": [
+        "virtual team management", "cross-timezone collaboration",
+        "digital presentation", "async communication", "remote culture"
+    ],
+    "executive_capabilities": [
+        "p&l responsibility", "strategic planning", "board presentation",
+        "stakeholder management", "organizational development"
+    ],
+    "sales_marketing_integration_skills": [
+        "crm management", "lead nurturing", "sales enablement",
+        "revenue attribution", "customer lifecycle"
+    ],
+
+    "education": [{
+        "degree": "string",
+        "institution": "string",
+        "graduation_year": "number or null",
+        "field_of_study": "string or null"
+    }],
+    "certifications": [{
+        "name": "string",
+        "issuer": "string",
+        "issue_date": "YYYY-MM-DD or null",
+        "expiry_date": "YYYY-MM-DD or null"
+    }],
+    "total_experience_years": "number",
+    "professional_summary": "string or null"
+}
+
+CRITICAL EXTRACTION RULES FOR NEW CATEGORIES:
+
+1. SEO/SEM TECHNICAL SKILLS - Look for:
+   - Core Web Vitals, schema markup, technical SEO audits
+   - Site speed optimization, Google Search Console
+   - Local SEO, keyword research, content optimization
+
+2. MARTECH/OPERATIONS - Look for:
+   - Salesforce, HubSpot, Marketo, Pardot
+   - Marketing automation, lead scoring, CRM integration
+   - Workflow automation, drip campaigns
+
+3. ADVANCED ANALYTICS - Look for:
+   - SQL, Python, R programming
+   - Tableau, Power BI, advanced GA4
+   - Predictive modeling, business intelligence
+
+4. AFFILIATE MARKETING - Look for:
+   - Commission tracking, affiliate networks
+   - Performance partnerships, affiliate attribution
+
+5. INFLUENCER MARKETING - Look for:
+   - Creator management, influencer ROI
+   - FTC compliance, influencer contracts
+
+6. PLATFORM LEADERSHIP - Look for:
+   - "Head of [Platform]", platform strategy
+   - Cross-platform integration, platform optimization
+
+7. INDUSTRY SPECIALIZATION - Look for:
+   - Healthcare, HIPAA, FDA compliance
+   - Financial services, B2B SaaS, ecommerce
+   - Luxury brands, automotive, travel
+
+8. REMOTE WORK SKILLS - Look for:
+   - Virtual team management, remote collaboration
+   - Cross-timezone work, digital presentations
+
+9. EXECUTIVE CAPABILITIES - Look for:
+   - P&L responsibility, strategic planning
+   - Board presentations, stakeholder management
+
+10. SALES-MARKETING INTEGRATION - Look for:
+    - CRM management, lead nurturing
+    - Sales enablement, revenue attribution
+"""
+
+
 class EnhancedCVProcessor:
     """Enhanced CV processor with market-based skill categories"""
     
-    def __init__(self, api_key: str):
-        self.client = Anthropic(api_key=api_key)
-        self.model = "claude-3-sonnet-20240229"
+    def __init__(self, api_key: str, cache_ttl_hours: float = 24, model: str = DEFAULT_MODEL):
+        self.client = get_anthropic_client(api_key)
+        self.model = model
+        # Reuse results for identical CV/job pairs (0 disables)
+        self.cache_ttl_hours = cache_ttl_hours
         
         # Enhanced keyword mappings
-        self.enhanced_keywords = ENHANCED_KEYWORDS
-        self.industry_indicators = INDUSTRY_EXPERTISE_INDICATORS
+        self.enhanced_keywords = _ENHANCED_KEYWORDS
+        self.industry_indicators = _INDUSTRY_INDICATORS
         self.scoring_weights = EnhancedScoringWeights()
         
         # Performance metrics patterns
@@ -43,10 +267,20 @@ class EnhancedCVProcessor:
     async def process_enhanced_cv(
         self, 
         cv_text: str, 
-        job_requirements: JobRequirements
+        job_requirements: JobRequirements,
+        use_cache: bool = True
     ) -> tuple[CandidateCV, ComprehensiveScore]:
         """Process CV with enhanced skill detection"""
         
+        use_cache = use_cache and self.cache_ttl_hours > 0
+        if use_cache:
+            cache_key = result_cache_key(cv_text, job_requirements)
+            found, cached = _result_cache.get(cache_key)
+            if found:
+                logger.info("Enhanced CV processing served from cache")
+                cv_data, score = cached
+                return cv_data.model_copy(deep=True), score.model_copy(deep=True)
+        
         try:
             # Extract structured data using enhanced Claude prompt
             cv_data = await self._extract_enhanced_cv_data(cv_text)
@@ -58,22 +292,52 @@ class EnhancedCVProcessor:
             score = await self._score_enhanced_candidate(cv_data, job_requirements)
             
             logger.info(f"Enhanced CV processing completed for {cv_data.name}")
+            if use_cache:
+                _result_cache.set(
+                    cache_key,
+                    (cv_data.model_copy(deep=True), score.model_copy(deep=True)),
+                    ttl=self.cache_ttl_hours * 3600
+                )
             return cv_data, score
             
         except Exception as e:
-            logger.error(f"Enhanced CV processing failed: {e}")
+            log_sampled(logger, _error_log_bucket, logging.ERROR, "Enhanced CV processing failed: %s", e)
             raise
     
     async def _extract_enhanced_cv_data(self, cv_text: str) -> CandidateCV:
+        """Extract CV data, joining an identical parse that is already running"""
+        
+        key = blake2b(_normalized_cv_bytes(cv_text), digest_size=16).hexdigest()
+        pending = _inflight_parses.get(key)
+        if pending is None:
+            pending = asyncio.ensure_future(self._parse_cv_with_claude(cv_text))
+            _inflight_parses[key] = pending
+            pending.add_done_callback(lambda _: _inflight_parses.pop(key, None))
+        
+        # Shielded so one caller going away doesn't cancel the others' parse;
+        # each caller gets its own copy since the result is enhanced in place
+        cv_data = await asyncio.shield(pending)
+        return cv_data.model_copy(deep=True)
+    
+    async def _parse_cv_with_claude(self, cv_text: str) -> CandidateCV:
         """Extract CV data using enhanced parsing prompt"""
         
-        prompt = self._create_enhanced_parsing_prompt(cv_text)
-        
-        message = self.client.messages.create(
+        # The client is synchronous; keep the event loop free while it waits
+        message = await asyncio.to_thread(
+            self.client.messages.create,
             model=self.model,
             max_tokens=4000,  # Increased for more detailed extraction
             temperature=0.1,
-            messages=[{"role": "user", "content": prompt}]
+            system=[{
+                "type": "text",
+                "text": _PARSING_INSTRUCTIONS,
+                "cache_control": {"type": "ephemeral"}
+            }],
+            messages=[{"role": "user", "content": f"CV Text:\n{cv_text}"}]
+        )
+        logger.info(
+            "CV parse prompt cache: %s tokens read, %s written",
+            message.usage.cache_read_input_tokens, message.usage.cache_creation_input_tokens
         )
         
         # Extract and parse JSON
@@ -135,43 +399,26 @@ class EnhancedCVProcessor:
     
     def _detect_skills_by_category(self, cv_text_lower: str, category: str) -> List[str]:
         """Detect skills by category using keyword matching"""
-        detected_skills = []
-        
-        if category in self.enhanced_keywords:
-            keywords = self.enhanced_keywords[category]
-            for keyword in keywords:
-                if keyword in cv_text_lower:
-                    detected_skills.append(keyword)
+        keywords = self.enhanced_keywords.get(category)
+        if not keywords:
+            return []
         
-        return detected_skills
+        hits = _keyword_hits(cv_text_lower)
+        return [keyword for keyword in keywords if keyword in hits]
     
     def _detect_industry_expertise(self, cv_text_lower: str) -> List[str]:
         """Detect industry specialization"""
-        detected_industries = []
-        
-        for industry, indicators in self.industry_indicators.items():
-            for indicator in indicators:
-                if indicator in cv_text_lower:
-                    detected_industries.append(industry)
-                    break  # One match per industry is enough
-        
-        return detected_industries
+        hits = _keyword_hits(cv_text_lower)
+        # One match per industry is enough
+        return [
+            industry for industry, indicators in self.industry_indicators.items()
+            if any(indicator in hits for indicator in indicators)
+        ]
     
     def _detect_executive_skills(self, cv_text_lower: str) -> List[str]:
         """Detect executive-level capabilities"""
-        executive_indicators = [
-            "p&l responsibility", "profit and loss", "budget management",
-            "strategic planning", "board presentation", "stakeholder management",
-            "organizational development", "team leadership", "culture transformation",
-            "market expansion", "business development", "investor relations"
-        ]
-        
-        detected_executive = []
-        for indicator in executive_indicators:
-            if indicator in cv_text_lower:
-                detected_executive.append(indicator)
-        
-        return detected_executive
+        hits = _keyword_hits(cv_text_lower)
+        return [indicator for indicator in _EXECUTIVE_INDICATORS if indicator in hits]
     
     async def _score_enhanced_candidate(
         self, 
@@ -270,150 +517,3 @@ class EnhancedCVProcessor:
         scores["executive"] = min(len(cv_data.executive_capabilities) * 20, 100.0)
         
         return scores
-    
-    def _create_enhanced_parsing_prompt(self, cv_text: str) -> str:
-        """Create enhanced parsing prompt with new skill categories"""
-        return f"""
-        Parse this CV for a digital media professional and extract comprehensive information including NEW SKILL CATEGORIES identified from market analysis. 
-        Return ONLY valid JSON that matches the enhanced CandidateCV schema:
-        
-        {{
-            "name": "string",
-            "contact": {{
-                "email": "string or null",
-                "phone": "string or null",
-                "linkedin": "string or null",
-                "location": "string or null",
-                "portfolio": "string or null"
-            }},
-            "experience": [{{
-                "title": "string",
-                "company": "string",
-                "duration_months": "number",
-                "description": "string or null",
-                "skills_used": ["skill1", "skill2"],
-                "start_date": "YYYY-MM-DD or null",
-                "end_date": "YYYY-MM-DD or null",
-                "achievements": [{{
-                    "title": "string",
-                    "description": "string",
-                    "quantifiable_result": "string or null"
-                }}]
-            }}],
-            "skills": ["skill1", "skill2"],
-            "detailed_skills": [{{
-                "skill_name": "string",
-                "proficiency_level": "beginner|intermediate|advanced|expert",
-                "years_experience": "number or null",
-                "skill_category": "SEO|MarTech|Analytics|etc or null",
-                "platform_specific": "Meta|Google|TikTok|etc or null",
-                "industry_specific": "Healthcare|FinTech|etc or null"
-            }}],
-            
-            // NEW ENHANCED SKILL CATEGORIES:
-            "seo_sem_expertise": [
-                "core web vitals", "schema markup", "technical seo", "local seo", 
-                "google search console", "site speed optimization", "keyword research"
-            ],
-            "martech_proficiency": [
-                "salesforce marketing cloud", "hubspot", "marketo", "pardot",
-                "marketing automation", "lead scoring", "crm integration"
-            ],
-            "advanced_analytics_skills": [
-                "sql", "python", "tableau", "power bi", "google analytics 4",
-                "predictive modeling", "business intelligence", "data visualization"
-            ],
-            "affiliate_marketing_experience": [
-                "commission tracking", "affiliate networks", "performance partnerships",
-                "affiliate attribution", "partner management"
-            ],
-            "influencer_marketing_experience": [
-                "creator management", "influencer roi", "ftc compliance",
-                "micro influencers", "influencer contracts"
-            ],
-            "platform_leadership_experience": [
-                "platform strategy", "head of platform", "platform optimization",
-                "cross-platform integration", "platform training"
-            ],
-            "industry_vertical_expertise": [
-                "healthcare", "financial services", "b2b saas", "ecommerce",
-                "luxury brands", "automotive", "travel"
-            ],
-            "remote_collaboration_skills": [
-                "virtual team management", "cross-timezone collaboration",
-                "digital presentation", "async communication", "remote culture"
-            ],
-            "executive_capabilities": [
-                "p&l responsibility", "strategic planning", "board presentation",
-                "stakeholder management", "organizational development"
-            ],
-            "sales_marketing_integration_skills": [
-                "crm management", "lead nurturing", "sales enablement",
-                "revenue attribution", "customer lifecycle"
-            ],
-            
-            "education": [{{
-                "degree": "string",
-                "institution": "string",
-                "graduation_year": "number or null",
-                "field_of_study": "string or null"
-            }}],
-            "certifications": [{{
-                "name": "string",
-                "issuer": "string",
-                "issue_date": "YYYY-MM-DD or null",
-                "expiry_date": "YYYY-MM-DD or null"
-            }}],
-            "total_experience_years": "number",
-            "professional_summary": "string or null"
-        }}
-        
-        CRITICAL EXTRACTION RULES FOR NEW CATEGORIES:
-        
-        1. SEO/SEM TECHNICAL SKILLS - Look for:
-           - Core Web Vitals, schema markup, technical SEO audits
-           - Site speed optimization, Google Search Console
-           - Local SEO, keyword research, content optimization
-        
-        2. MARTECH/OPERATIONS - Look for:
-           - Salesforce, HubSpot, Marketo, Pardot
-           - Marketing automation, lead scoring, CRM integration
-           - Workflow automation, drip campaigns
-        
-        3. ADVANCED ANALYTICS - Look for:
-           - SQL, Python, R programming
-           - Tableau, Power BI, advanced GA4
-           - Predictive modeling, business intelligence
-        
-        4. AFFILIATE MARKETING - Look for:
-           - Commission tracking, affiliate networks
-           - Performance partnerships, affiliate attribution
-        
-        5. INFLUENCER MARKETING - Look for:
-           - Creator management, influencer ROI
-           - FTC compliance, influencer contracts
-        
-        6. PLATFORM LEADERSHIP - Look for:
-           - "Head of [Platform]", platform strategy
-           - Cross-platform integration, platform optimization
-        
-        7. INDUSTRY SPECIALIZATION - Look for:
-           - Healthcare, HIPAA, FDA compliance
-           - Financial services, B2B SaaS, ecommerce
-           - Luxury brands, automotive, travel
-        
-        8. REMOTE WORK SKILLS - Look for:
-           - Virtual team management, remote collaboration
-           - Cross-timezone work, digital presentations
-        
-        9. EXECUTIVE CAPABILITIES - Look for:
-           - P&L responsibility, strategic planning
-           - Board presentations, stakeholder management
-        
-        10. SALES-MARKETING INTEGRATION - Look for:
-            - CRM management, lead nurturing
-            - Sales enablement, revenue attribution
-        
-        CV Text:
-        {cv_text}
-        """
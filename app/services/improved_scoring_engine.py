@@ -1,10 +1,46 @@
+from __future__ import annotations
+
 import logging
-from typing import Dict, Any, List, Set, Optional
-from ..models.cv_models import CandidateCV, JobRequirements, ComprehensiveScore
-from ..models.api_models import CVAnalysisResponse
+from collections import Counter
+from types import MappingProxyType
+from typing import TYPE_CHECKING, AbstractSet, Dict, Any, Iterator, List, Mapping, Set, Tuple
+from ..models.cv_models import ComprehensiveScore
+
+if TYPE_CHECKING:
+    from ..models.cv_models import CandidateCV, Experience, JobRequirements
 
 logger = logging.getLogger(__name__)
 
+# Domains that share enough skills to earn partial credit for each other
+_RELATED_DOMAINS: Mapping[str, Tuple[str, ...]] = MappingProxyType({
+    'software_engineering': ('data_science',),
+    'data_science': ('software_engineering',),
+    'digital_marketing': (),  # Marketing is quite specialized
+    'mechanical_engineering': (),  # Engineering is very specialized
+    'finance': ()  # Finance is very specialized
+})
+
+# General business roles and the score awarded for transferable skills
+_TRANSFERABLE_ROLES: Mapping[str, float] = MappingProxyType({
+    'project_management': 30.0,
+    'team_leadership': 25.0,
+    'business_analysis': 40.0,
+    'sales': 35.0,
+    'marketing': 30.0
+})
+
+_TECHNICAL_DOMAINS: Tuple[str, ...] = ('mechanical_engineering', 'software_engineering')
+
+# Skills treated as related but not exact matches
+_SKILL_RELATIONSHIPS: Mapping[str, Tuple[str, ...]] = MappingProxyType({
+    'javascript': ('js', 'typescript', 'node.js'),
+    'python': ('django', 'flask', 'fastapi', 'pandas'),
+    'sql': ('mysql', 'postgresql', 'sqlite', 'database'),
+    'aws': ('cloud', 'ec2', 's3', 'lambda'),
+    'react': ('javascript', 'frontend', 'ui'),
+    'machine learning': ('ai', 'data science', 'ml', 'artificial intelligence')
+})
+
 class ImprovedScoringEngine:
     """
     Enhanced CV scoring engine that prevents false matches by analyzing:
@@ -48,6 +84,19 @@ class ImprovedScoringEngine:
             }
         }
         
+        # Flattened views of domain_skills for the scoring loops:
+        # every keyword per domain, and for each keyword how many categories
+        # list it in each domain (so a skill resolves with one dict lookup)
+        self._domain_keywords: Dict[str, Tuple[str, ...]] = {
+            domain: tuple(skill for category_skills in categories.values() for skill in category_skills)
+            for domain, categories in self.domain_skills.items()
+        }
+        self._keyword_domains: Dict[str, Counter] = {}
+        for domain, categories in self.domain_skills.items():
+            for category_skills in categories.values():
+                for skill in set(category_skills):
+                    self._keyword_domains.setdefault(skill, Counter())[domain] += 1
+        
         # Keywords that indicate specific technical roles
         self.exclusion_keywords = {
             'engineering_physical': ['mechanical', 'electrical', 'civil', 'chemical', 'aerospace', 'biomedical'],
@@ -136,23 +185,21 @@ class ImprovedScoringEngine:
         """Identify the primary domain of the job"""
         title_lower = job_req.title.lower()
         desc_lower = job_req.description.lower()
-        all_skills = job_req.required_skills + job_req.preferred_skills
-        all_skills_lower = [skill.lower() for skill in all_skills]
+        all_skills_lower = job_req.required_skill_set | job_req.preferred_skill_set
         
         domain_scores = {}
         
-        for domain, categories in self.domain_skills.items():
+        for domain, keywords in self._domain_keywords.items():
             score = 0
             
             # Check title
-            for category_skills in categories.values():
-                for skill in category_skills:
-                    if skill in title_lower:
-                        score += 3  # Title matches are strong indicators
-                    if skill in desc_lower:
-                        score += 1
-                    if skill in all_skills_lower:
-                        score += 2
+            for skill in keywords:
+                if skill in title_lower:
+                    score += 3  # Title matches are strong indicators
+                if skill in desc_lower:
+                    score += 1
+                if skill in all_skills_lower:
+                    score += 2
             
             domain_scores[domain] = score
         
@@ -171,24 +218,19 @@ class ImprovedScoringEngine:
         # Analyze job titles
         job_titles = [exp.title.lower() for exp in cv.experience]
         
-        # Analyze skills
-        all_skills = [skill.lower() for skill in cv.skills]
+        # Analyze skills (one point per category listing the skill)
+        skill_scores = Counter()
+        for skill in cv.skills:
+            skill_scores.update(self._keyword_domains.get(skill.lower(), ()))
         
-        for domain, categories in self.domain_skills.items():
-            score = 0
+        for domain, keywords in self._domain_keywords.items():
+            score = skill_scores[domain]
             
             # Check job titles
             for title in job_titles:
-                for category_skills in categories.values():
-                    for skill in category_skills:
-                        if skill in title:
-                            score += 2
-            
-            # Check skills
-            for skill in all_skills:
-                for category_skills in categories.values():
-                    if skill in category_skills:
-                        score += 1
+                for skill in keywords:
+                    if skill in title:
+                        score += 2
             
             # If candidate has significant experience in this domain
             if score >= 3:
@@ -198,18 +240,10 @@ class ImprovedScoringEngine:
     
     def _check_related_domains(self, job_domain: str, candidate_domains: List[str]) -> float:
         """Check for related domain overlap"""
-        related_domains = {
-            'software_engineering': ['data_science'],
-            'data_science': ['software_engineering'],
-            'digital_marketing': [],  # Marketing is quite specialized
-            'mechanical_engineering': [],  # Engineering is very specialized
-            'finance': []  # Finance is very specialized
-        }
-        
-        if job_domain in related_domains:
-            for candidate_domain in candidate_domains:
-                if candidate_domain in related_domains[job_domain]:
-                    return 60.0  # Moderate score for related domains
+        related = _RELATED_DOMAINS.get(job_domain, ())
+        for candidate_domain in candidate_domains:
+            if candidate_domain in related:
+                return 60.0  # Moderate score for related domains
         
         return 0.0
     
@@ -218,17 +252,9 @@ class ImprovedScoringEngine:
         """Check for transferable skills across domains"""
         
         # Some roles have more transferable skills than others
-        transferable_roles = {
-            'project_management': 30.0,
-            'team_leadership': 25.0,
-            'business_analysis': 40.0,
-            'sales': 35.0,
-            'marketing': 30.0
-        }
-        
         # Check if the job is more of a general business role
         job_title_lower = job_req.title.lower()
-        for role, score in transferable_roles.items():
+        for role, score in _TRANSFERABLE_ROLES.items():
             if role.replace('_', ' ') in job_title_lower:
                 return score
         
@@ -240,18 +266,17 @@ class ImprovedScoringEngine:
                 leadership_score += 5.0
         
         # Very low score for completely unrelated technical domains
-        technical_domains = ['mechanical_engineering', 'software_engineering']
-        if (job_domain in technical_domains and 
-            not any(domain in technical_domains for domain in candidate_domains)):
+        if (job_domain in _TECHNICAL_DOMAINS and 
+            not any(domain in _TECHNICAL_DOMAINS for domain in candidate_domains)):
             return min(20.0, leadership_score)  # Max 20% for completely different technical fields
         
         return min(40.0, leadership_score)
     
     def _analyze_skills_deeply(self, cv: CandidateCV, job_req: JobRequirements) -> Dict[str, Any]:
         """Deep analysis of skills alignment"""
-        cv_skills_lower = set(skill.lower() for skill in cv.skills)
-        required_skills_lower = set(skill.lower() for skill in job_req.required_skills)
-        preferred_skills_lower = set(skill.lower() for skill in job_req.preferred_skills)
+        cv_skills_lower = cv.skill_set
+        required_skills_lower = job_req.required_skill_set
+        preferred_skills_lower = job_req.preferred_skill_set
         
         # Find exact matches
         required_matches = cv_skills_lower.intersection(required_skills_lower)
@@ -278,28 +303,18 @@ class ImprovedScoringEngine:
             'related_matches': list(related_matches)
         }
     
-    def _find_related_skill_matches(self, cv_skills: Set[str], required_skills: Set[str]) -> Set[str]:
+    def _find_related_skill_matches(self, cv_skills: AbstractSet[str], required_skills: AbstractSet[str]) -> Set[str]:
         """Find skills that are related but not exact matches"""
         related_matches = set()
         
-        # Define skill relationships
-        skill_relationships = {
-            'javascript': ['js', 'typescript', 'node.js'],
-            'python': ['django', 'flask', 'fastapi', 'pandas'],
-            'sql': ['mysql', 'postgresql', 'sqlite', 'database'],
-            'aws': ['cloud', 'ec2', 's3', 'lambda'],
-            'react': ['javascript', 'frontend', 'ui'],
-            'machine learning': ['ai', 'data science', 'ml', 'artificial intelligence']
-        }
-        
         for required_skill in required_skills:
             for cv_skill in cv_skills:
                 # Check if skills are related
-                if required_skill in skill_relationships:
-                    if cv_skill in skill_relationships[required_skill]:
+                if required_skill in _SKILL_RELATIONSHIPS:
+                    if cv_skill in _SKILL_RELATIONSHIPS[required_skill]:
                         related_matches.add(required_skill)
-                elif cv_skill in skill_relationships:
-                    if required_skill in skill_relationships[cv_skill]:
+                elif cv_skill in _SKILL_RELATIONSHIPS:
+                    if required_skill in _SKILL_RELATIONSHIPS[cv_skill]:
                         related_matches.add(required_skill)
         
         return related_matches
@@ -345,9 +360,8 @@ class ImprovedScoringEngine:
             # Check title similarity
             title_similarity = self._calculate_title_similarity(exp.title.lower(), job_title_keywords)
             
-            # Check domain alignment
-            exp_domains = self._identify_experience_domain(exp)
-            domain_alignment = 100.0 if job_domain in exp_domains else 0.0
+            # Check domain alignment (stops scanning once the job's domain turns up)
+            domain_alignment = 100.0 if job_domain in self._identify_experience_domain(exp) else 0.0
             
             # Combined relevance for this experience
             exp_relevance = (title_similarity * 0.6 + domain_alignment * 0.4)
@@ -366,24 +380,14 @@ class ImprovedScoringEngine:
         common_words = exp_words.intersection(job_words)
         return (len(common_words) / len(job_words)) * 100
     
-    def _identify_experience_domain(self, experience: 'Experience') -> List[str]:
-        """Identify domain of a specific experience"""
+    def _identify_experience_domain(self, experience: Experience) -> Iterator[str]:
+        """Yield each domain whose keywords appear in an experience's title or company"""
         title_lower = experience.title.lower()
         company_lower = experience.company.lower()
         
-        domains = []
-        
-        for domain, categories in self.domain_skills.items():
-            score = 0
-            for category_skills in categories.values():
-                for skill in category_skills:
-                    if skill in title_lower or skill in company_lower:
-                        score += 1
-            
-            if score >= 1:
-                domains.append(domain)
-        
-        return domains
+        for domain, keywords in self._domain_keywords.items():
+            if any(skill in title_lower or skill in company_lower for skill in keywords):
+                yield domain
     
     def _analyze_career_progression(self, cv: CandidateCV) -> float:
         """Analyze career progression pattern"""
@@ -421,13 +425,9 @@ class ImprovedScoringEngine:
             return 0.0
         
         # Count skills that appear in our domain definitions
+        # (once per domain listing the skill)
         for skill in cv.skills:
-            skill_lower = skill.lower()
-            for domain, categories in self.domain_skills.items():
-                for category_skills in categories.values():
-                    if skill_lower in category_skills:
-                        technical_skills += 1
-                        break
+            technical_skills += len(self._keyword_domains.get(skill.lower(), ()))
         
         # Calculate depth vs breadth ratio
         depth_ratio = technical_skills / total_skills if total_skills > 0 else 0
@@ -456,9 +456,8 @@ class ImprovedScoringEngine:
             red_flags.append(f"Domain mismatch: Candidate has {domain_names.get(candidate_domains[0] if candidate_domains else 'Unknown', 'Unknown')} background, job requires {domain_names.get(job_domain, job_domain)}")
         
         # Skills gap red flag
-        required_skills = set(skill.lower() for skill in job_req.required_skills)
-        cv_skills = set(skill.lower() for skill in cv.skills)
-        missing_skills = required_skills - cv_skills
+        required_skills = job_req.required_skill_set
+        missing_skills = required_skills - cv.skill_set
         
         if len(missing_skills) > len(required_skills) * 0.5:  # Missing more than 50% of required skills
             red_flags.append(f"Major skills gap: Missing {len(missing_skills)} of {len(required_skills)} required skills")
@@ -3,32 +3,147 @@ WebSocket Manager for Real-Time CV Analysis Updates
 Handles connection lifecycle, message broadcasting, and session management
 """
 
-import json
 import logging
 import asyncio
-from typing import Dict, Set, Optional, Any
+import itertools
+import time
+from collections import deque
+from typing import Annotated, Awaitable, Deque, Dict, List, Literal, NamedTuple, Optional, Any, Set, Tuple, TypeVar, Union
 from datetime import datetime
 from fastapi import WebSocket, WebSocketDisconnect
-from pydantic import BaseModel, Field
-import uuid
+from pydantic import BaseModel, Field, TypeAdapter
+import secrets
+import orjson
 
 logger = logging.getLogger(__name__)
 
+# Upper bound on messages held for a session with no open connections
+MAX_QUEUED_MESSAGES = 256
+
+# Seconds a single socket write may take before the client is treated as stalled
+SEND_TIMEOUT = 5.0
+
+# Close codes for connections the server drops; clients reconnect on either
+STALLED_CLOSE_CODE = 1013  # Try Again Later
+SEND_ERROR_CLOSE_CODE = 1011  # Internal Error
+
+# Upper bound on payloads waiting to be written to one connection
+# (room for a full replay of the session queue plus live updates)
+MAX_PENDING_SENDS = 2 * MAX_QUEUED_MESSAGES
+
+# Upper bound on intervention requests kept per session (oldest dropped first)
+MAX_INTERVENTIONS = 256
+
+# Upper bound on intervention responses kept per session (oldest dropped first)
+MAX_INTERVENTION_RESPONSES = 1024
+
+# Intervention responses echoed to a session per batch_interventions frame
+MAX_INTERVENTION_BATCH = 16
+
+# Upper bound on the size of a frame built from several queued payloads
+MAX_BATCH_BYTES = 8192
+
+# Seconds a snapshot of all sessions is reused for monitor polls
+SESSION_SNAPSHOT_TTL = 1.0
+
+# Seconds between checks that a watched session still has listeners
+WATCHDOG_INTERVAL = 0.5
+
+# Seconds a watched session may go without connections before its work is
+# cancelled (room for a client to reconnect and replay queued messages)
+ABANDON_GRACE_PERIOD = 10.0
+
+# Seconds a session's queued messages and intervention records outlive its
+# last connection (or, for a session no client has opened, its first message),
+# so a client that reconnects can still answer; sessions with work still
+# running are kept until the work finishes or is abandoned
+IDLE_SESSION_TTL = 60.0
+
+# Upper bound on sessions without connections whose state is kept (oldest dropped first)
+MAX_IDLE_SESSIONS = 1024
+
+T = TypeVar("T")
+
+
+class SessionAbandonedError(Exception):
+    """Raised when work is cancelled because its session lost every connection"""
+
+
+def encode_message(message: Dict[str, Any]) -> bytes:
+    """Serialize a message to JSON bytes for a WebSocket frame"""
+    return orjson.dumps(message, option=orjson.OPT_NAIVE_UTC)
+
+
+_BATCH_PREFIX = b'{"type":"batch","messages":['
+_BATCH_SUFFIX = b"]}"
+
+
+def encode_batch(payloads: List[bytes]) -> bytes:
+    """Wrap already-encoded messages in a single batch frame"""
+    return _BATCH_PREFIX + b",".join(payloads) + _BATCH_SUFFIX
+
+
+# Frames with constant content are encoded once
+PONG_FRAME = encode_message({"type": "pong"})
+UNKNOWN_INTERVENTION_FRAME = encode_message({
+    "type": "error",
+    "error": "Unknown intervention"
+})
+
+# Timestamps are reused for calls within this many seconds of event-loop time
+CLOCK_RESOLUTION = 0.001
+
+_clock_tick = float("-inf")
+_clock_now = datetime.min
+_clock_iso = ""
+
+
+def _refresh_clock():
+    """Re-read the wall clock if the event loop has advanced past the last tick"""
+    global _clock_tick, _clock_now, _clock_iso
+    try:
+        tick = asyncio.get_running_loop().time()
+        if tick - _clock_tick < CLOCK_RESOLUTION:
+            return
+        _clock_tick = tick
+    except RuntimeError:
+        # Outside the event loop there is no tick to share
+        pass
+    _clock_now = datetime.utcnow()
+    _clock_iso = _clock_now.isoformat()
+
+
+def utcnow() -> datetime:
+    """Current UTC time, shared by all messages built in the same loop tick"""
+    _refresh_clock()
+    return _clock_now
+
+
+def utcnow_iso() -> str:
+    """ISO-8601 form of utcnow(), formatted once per loop tick"""
+    _refresh_clock()
+    return _clock_iso
+
+
+# Process-local id sequences for short-lived connection and step records
+_connection_ids = itertools.count(1)
+_step_ids = itertools.count(1)
+
 
 class WebSocketMessage(BaseModel):
     """Standard message format for WebSocket communication"""
     type: str = Field(..., description="Message type (process_update, intervention_request, etc.)")
     session_id: str = Field(..., description="Analysis session ID")
-    timestamp: datetime = Field(default_factory=datetime.utcnow)
+    timestamp: datetime = Field(default_factory=utcnow)
     data: Dict[str, Any] = Field(default_factory=dict)
     metadata: Dict[str, Any] = Field(default_factory=dict)
 
 
 class ProcessUpdate(BaseModel):
     """Process update message structure"""
-    step_id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    step_id: str = Field(default_factory=lambda: f"s{next(_step_ids)}")
     step_name: str
-    status: str = Field(..., regex="^(started|in_progress|completed|failed|intervention_required)$")
+    status: Literal["started", "in_progress", "completed", "failed", "intervention_required"]
     confidence: float = Field(..., ge=0.0, le=1.0)
     explanation: str
     details: Optional[Dict[str, Any]] = None
@@ -36,29 +151,75 @@ class ProcessUpdate(BaseModel):
     intervention_type: Optional[str] = None
 
 
+class PingMessage(BaseModel):
+    """Client keep-alive message"""
+    type: Literal["ping"]
+
+
+class InterventionResponseMessage(BaseModel):
+    """Client decision for a pending intervention request"""
+    type: Literal["intervention_response"]
+    intervention_id: str
+    response: Any = None
+    session_id: Optional[str] = None
+
+
+# Inbound client messages, told apart by their "type" field
+ClientMessage = Annotated[
+    Union[PingMessage, InterventionResponseMessage],
+    Field(discriminator="type")
+]
+client_message_adapter = TypeAdapter(ClientMessage)
+
+
 class ConnectionInfo(BaseModel):
     """WebSocket connection information"""
-    connection_id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    connection_id: str = Field(default_factory=lambda: f"c{next(_connection_ids)}")
     session_id: str
-    connected_at: datetime = Field(default_factory=datetime.utcnow)
-    last_ping: datetime = Field(default_factory=datetime.utcnow)
+    connected_at: datetime = Field(default_factory=utcnow)
+    last_ping: datetime = Field(default_factory=utcnow)
     client_info: Dict[str, Any] = Field(default_factory=dict)
 
 
+class Outbox(NamedTuple):
+    """Bounded send queue and the task that writes it to one WebSocket"""
+    queue: asyncio.Queue
+    writer: asyncio.Task
+
+
 class WebSocketManager:
     """
     Manages WebSocket connections for real-time CV analysis updates
     """
     
     def __init__(self):
-        # Connection pools organized by session_id
-        self._connections: Dict[str, Set[WebSocket]] = {}
+        # Connection pools organized by session_id, with each socket's outbox
+        # (a session is active exactly while it has an entry here)
+        self._connections: Dict[str, Dict[WebSocket, Outbox]] = {}
         # Connection metadata
         self._connection_info: Dict[WebSocket, ConnectionInfo] = {}
-        # Active sessions
-        self._active_sessions: Set[str] = set()
         # Message queue for reliability
-        self._message_queue: Dict[str, list] = {}
+        self._message_queue: Dict[str, Deque[bytes]] = {}
+        # Intervention requests per session keyed by id in the order raised,
+        # with their ids indexed by type for O(1) lookups
+        self._interventions: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self._interventions_by_type: Dict[str, Dict[str, Deque[str]]] = {}
+        # Intervention responses per session, and those not yet echoed to clients
+        self._intervention_responses: Dict[str, Deque[Dict[str, Any]]] = {}
+        self._unsent_responses: Dict[str, List[Dict[str, Any]]] = {}
+        # Sessions without connections by when they went idle (oldest first),
+        # and the number of run_while_connected calls watching each session
+        self._idle_since: Dict[str, float] = {}
+        self._watchers: Dict[str, int] = {}
+        # Scheduled response echoes, referenced until they finish
+        self._flush_tasks: Set[asyncio.Task] = set()
+        # Handlers for inbound client messages by message model
+        self._message_handlers = {
+            PingMessage: self._handle_ping,
+            InterventionResponseMessage: self._handle_intervention_response,
+        }
+        # Memoized (built_at, session infos) for monitor polls
+        self._sessions_snapshot: Tuple[float, List[Dict[str, Any]]] = (float("-inf"), [])
         # Lock for thread-safe operations
         self._lock = asyncio.Lock()
         
@@ -83,27 +244,27 @@ class WebSocketManager:
                 client_info=client_info or {}
             )
             
-            # Add to connection pool
-            if session_id not in self._connections:
-                self._connections[session_id] = set()
-                self._message_queue[session_id] = []
-            
-            self._connections[session_id].add(websocket)
+            # Add to connection pool with a dedicated writer
+            queue: asyncio.Queue = asyncio.Queue(maxsize=MAX_PENDING_SENDS)
+            writer = asyncio.create_task(self._writer(websocket, queue))
+            self._connections.setdefault(session_id, {})[websocket] = Outbox(queue, writer)
             self._connection_info[websocket] = conn_info
-            self._active_sessions.add(session_id)
+            self._idle_since.pop(session_id, None)
+            if session_id not in self._message_queue:
+                self._message_queue[session_id] = deque(maxlen=MAX_QUEUED_MESSAGES)
             
-            logger.info(f"WebSocket connected: session={session_id}, connection={conn_info.connection_id}")
+            logger.info("WebSocket connected: session=%s, connection=%s", session_id, conn_info.connection_id)
             
             # Send connection confirmation
-            await self._send_direct(websocket, {
+            await self.send_direct(websocket, {
                 "type": "connection_established",
                 "session_id": session_id,
                 "connection_id": conn_info.connection_id,
-                "timestamp": datetime.utcnow().isoformat()
+                "timestamp": utcnow_iso()
             })
             
             # Send any queued messages
-            await self._send_queued_messages(websocket, session_id)
+            self._send_queued_messages(websocket, session_id)
             
             return conn_info.connection_id
     
@@ -115,53 +276,59 @@ class WebSocketManager:
             websocket: The WebSocket connection to remove
         """
         async with self._lock:
-            if websocket in self._connection_info:
-                conn_info = self._connection_info[websocket]
-                session_id = conn_info.session_id
-                
-                # Remove from connection pool
-                if session_id in self._connections:
-                    self._connections[session_id].discard(websocket)
-                    
-                    # Clean up empty sessions
-                    if not self._connections[session_id]:
-                        del self._connections[session_id]
-                        self._active_sessions.discard(session_id)
-                        # Keep message queue for reconnection
-                
-                # Remove connection info
-                del self._connection_info[websocket]
+            # Remove connection info
+            conn_info = self._connection_info.pop(websocket, None)
+            if conn_info is None:
+                return
+            session_id = conn_info.session_id
+            
+            # Remove from connection pool and stop its writer
+            connections = self._connections.get(session_id)
+            if connections is not None:
+                outbox = connections.pop(websocket, None)
+                if outbox and outbox.writer is not asyncio.current_task():
+                    outbox.writer.cancel()
                 
-                logger.info(f"WebSocket disconnected: session={session_id}, connection={conn_info.connection_id}")
+                # Clean up empty sessions
+                # (message queue and interventions are kept for reconnection)
+                if not connections:
+                    del self._connections[session_id]
+                    self._mark_idle(session_id)
+            
+            logger.info("WebSocket disconnected: session=%s, connection=%s", session_id, conn_info.connection_id)
     
-    async def broadcast_to_session(self, session_id: str, message: Dict[str, Any]):
+    async def broadcast_to_session(self, session_id: str, message: Union[Dict[str, Any], bytes]):
         """
         Broadcast a message to all connections in a session
         
         Args:
             session_id: Target session ID
-            message: Message to broadcast
+            message: Message to broadcast, or its already-encoded payload
         """
+        # Encode once, outside the lock, for every connection and the replay queue
+        payload = message if isinstance(message, bytes) else encode_message(message)
+        
         async with self._lock:
-            if session_id not in self._connections:
+            if not self._connections.get(session_id):
                 # Queue message for future connections
+                # (oldest messages are dropped once the queue is full)
                 if session_id not in self._message_queue:
-                    self._message_queue[session_id] = []
-                self._message_queue[session_id].append(message)
+                    self._message_queue[session_id] = deque(maxlen=MAX_QUEUED_MESSAGES)
+                self._message_queue[session_id].append(payload)
+                self._mark_idle(session_id)
                 return
             
-            # Send to all connections in parallel
-            disconnected = []
-            tasks = []
-            
-            for websocket in self._connections[session_id]:
-                tasks.append(self._send_safe(websocket, message, disconnected))
-            
-            await asyncio.gather(*tasks)
-            
-            # Clean up disconnected sockets
-            for ws in disconnected:
-                await self.disconnect(ws)
+            # Hand the payload to every connection's writer
+            overflowed = [
+                websocket for websocket, outbox in self._connections[session_id].items()
+                if not self._enqueue(outbox, payload)
+            ]
+        
+        # Drop clients that fell too far behind
+        for websocket in overflowed:
+            logger.warning("Dropping slow WebSocket in session %s", session_id)
+            await self.disconnect(websocket)
+            await self._close(websocket, STALLED_CLOSE_CODE)
     
     async def send_process_update(self, session_id: str, update: ProcessUpdate):
         """
@@ -171,13 +338,17 @@ class WebSocketManager:
             session_id: Target session ID
             update: Process update information
         """
-        message = WebSocketMessage(
-            type="process_update",
-            session_id=session_id,
-            data=update.dict()
-        )
+        # Same shape as WebSocketMessage, built directly so the update is
+        # dumped once rather than validated and dumped again inside a wrapper
+        payload = encode_message({
+            "type": "process_update",
+            "session_id": session_id,
+            "timestamp": utcnow(),
+            "data": update.model_dump(),
+            "metadata": {}
+        })
         
-        await self.broadcast_to_session(session_id, message.dict())
+        await self.broadcast_to_session(session_id, payload)
     
     async def request_intervention(self, session_id: str, intervention_type: str, 
                                  context: Dict[str, Any]) -> Optional[Dict[str, Any]]:
@@ -192,7 +363,7 @@ class WebSocketManager:
         Returns:
             Intervention response or None if timeout
         """
-        intervention_id = str(uuid.uuid4())
+        intervention_id = secrets.token_hex(16)
         
         message = WebSocketMessage(
             type="intervention_request",
@@ -205,84 +376,318 @@ class WebSocketManager:
             }
         )
         
-        await self.broadcast_to_session(session_id, message.dict())
+        # Record the request and index it by type at push time
+        interventions = self._interventions.setdefault(session_id, {})
+        by_type = self._interventions_by_type.setdefault(session_id, {})
+        if len(interventions) >= MAX_INTERVENTIONS:
+            # The oldest request is also the oldest of its type
+            oldest_id = next(iter(interventions))
+            oldest_type = interventions.pop(oldest_id)["intervention_type"]
+            by_type[oldest_type].popleft()
+            if not by_type[oldest_type]:
+                del by_type[oldest_type]
+        interventions[intervention_id] = message.data
+        by_type.setdefault(intervention_type, deque()).append(intervention_id)
+        
+        # Also starts the idle clock of a session with no connections
+        await self.broadcast_to_session(session_id, message.model_dump())
         
         # Wait for intervention response (simplified - in production use proper async event handling)
         # This would be handled by a separate endpoint that receives the intervention response
         return None  # Placeholder
     
-    async def _send_direct(self, websocket: WebSocket, message: Dict[str, Any]):
-        """Send a message directly to a WebSocket"""
+    def _mark_idle(self, session_id: str):
+        """Start a session's idle clock and evict sessions idle for too long"""
+        self._idle_since.setdefault(session_id, time.monotonic())
+        self._evict_idle_sessions()
+    
+    def _evict_idle_sessions(self):
+        """
+        Forget sessions without connections for IDLE_SESSION_TTL, unless work is running
+        
+        Beyond MAX_IDLE_SESSIONS the oldest idle sessions go first, expired or not.
+        """
+        cutoff = time.monotonic() - IDLE_SESSION_TTL
+        excess = len(self._idle_since) - MAX_IDLE_SESSIONS
+        expired = []
+        for session_id, idle_since in self._idle_since.items():
+            if idle_since > cutoff and len(expired) >= excess:
+                break
+            if session_id not in self._watchers:
+                expired.append(session_id)
+        
+        for session_id in expired:
+            del self._idle_since[session_id]
+            self._clear_session_state(session_id)
+    
+    def _clear_session_state(self, session_id: str):
+        """Forget a session's queued messages and intervention records"""
+        self._message_queue.pop(session_id, None)
+        self._interventions.pop(session_id, None)
+        self._interventions_by_type.pop(session_id, None)
+        self._intervention_responses.pop(session_id, None)
+        self._unsent_responses.pop(session_id, None)
+    
+    @staticmethod
+    def _enqueue(outbox: Outbox, payload: bytes) -> bool:
+        """Queue a payload for a connection's writer; False if its outbox is full"""
         try:
-            await websocket.send_json(message)
-        except Exception as e:
-            logger.error(f"Error sending message: {e}")
-            raise
+            outbox.queue.put_nowait(payload)
+            return True
+        except asyncio.QueueFull:
+            return False
     
-    async def _send_safe(self, websocket: WebSocket, message: Dict[str, Any], 
-                        disconnected: list):
-        """Send a message safely, tracking disconnections"""
+    def _outbox(self, websocket: WebSocket) -> Optional[Outbox]:
+        """Look up the outbox of a registered WebSocket"""
+        conn_info = self._connection_info.get(websocket)
+        if conn_info is None:
+            return None
+        return self._connections.get(conn_info.session_id, {}).get(websocket)
+    
+    async def _writer(self, websocket: WebSocket, queue: asyncio.Queue):
+        """Write queued payloads to a WebSocket until it fails or is disconnected"""
+        carry: Optional[bytes] = None
+        close_code: Optional[int] = None
         try:
-            await websocket.send_json(message)
+            while True:
+                payload = carry if carry is not None else await queue.get()
+                carry = None
+                
+                # Fold messages that piled up during the previous write into
+                # one batch frame; a lone message is sent as is
+                batch = [payload]
+                # Size of the batch frame, envelope included
+                size = len(_BATCH_PREFIX) + len(payload) + len(_BATCH_SUFFIX)
+                while not queue.empty():
+                    queued = queue.get_nowait()
+                    if size + 1 + len(queued) > MAX_BATCH_BYTES:
+                        carry = queued
+                        break
+                    batch.append(queued)
+                    size += 1 + len(queued)
+                if len(batch) > 1:
+                    payload = encode_batch(batch)
+                
+                await asyncio.wait_for(websocket.send_bytes(payload), SEND_TIMEOUT)
+        except asyncio.TimeoutError:
+            logger.warning("Dropping stalled WebSocket")
+            close_code = STALLED_CLOSE_CODE
         except (WebSocketDisconnect, ConnectionError):
-            disconnected.append(websocket)
+            pass
+        except Exception as e:
+            logger.error("Error sending message: %s", e)
+            close_code = SEND_ERROR_CLOSE_CODE
+        
+        await self.disconnect(websocket)
+        if close_code is not None:
+            await self._close(websocket, close_code)
+    
+    @staticmethod
+    async def _close(websocket: WebSocket, code: int):
+        """Close a dropped WebSocket so its client knows to reconnect"""
+        try:
+            await asyncio.wait_for(websocket.close(code=code), SEND_TIMEOUT)
         except Exception as e:
-            logger.error(f"Error sending message: {e}")
-            disconnected.append(websocket)
+            # Already closed, or too stalled to take the close frame
+            logger.debug("Could not close dropped WebSocket: %s", e)
+    
+    async def send_direct(self, websocket: WebSocket, message: Union[Dict[str, Any], bytes]):
+        """
+        Queue a message (or pre-encoded payload) for a single WebSocket
+        
+        Goes through the connection's outbox, so it is written in order with
+        broadcasts rather than racing the writer task.
+        """
+        outbox = self._outbox(websocket)
+        if outbox is None:
+            logger.warning("Message for unknown connection")
+            return
+        
+        if not isinstance(message, bytes):
+            message = encode_message(message)
+        if not self._enqueue(outbox, message):
+            logger.warning("Dropping message for slow WebSocket")
     
-    async def _send_queued_messages(self, websocket: WebSocket, session_id: str):
-        """Send any queued messages to a newly connected client"""
+    def _send_queued_messages(self, websocket: WebSocket, session_id: str):
+        """Queue any held messages for a newly connected client"""
         if session_id in self._message_queue and self._message_queue[session_id]:
-            for message in self._message_queue[session_id]:
-                try:
-                    await websocket.send_json(message)
-                except Exception as e:
-                    logger.error(f"Error sending queued message: {e}")
+            outbox = self._outbox(websocket)
+            for payload in self._message_queue[session_id]:
+                if not self._enqueue(outbox, payload):
+                    logger.error("Error sending queued message: outbox full")
                     break
             
             # Clear queue after sending
-            self._message_queue[session_id] = []
+            self._message_queue[session_id].clear()
     
-    async def handle_client_message(self, websocket: WebSocket, message: Dict[str, Any]):
+    async def handle_client_message(self, websocket: WebSocket, message: ClientMessage):
         """
         Handle incoming messages from clients
         
         Args:
             websocket: Source WebSocket
-            message: Received message
+            message: Received message, decoded with client_message_adapter
         """
-        if websocket not in self._connection_info:
+        conn_info = self._connection_info.get(websocket)
+        if conn_info is None:
             logger.warning("Message from unknown connection")
             return
         
-        conn_info = self._connection_info[websocket]
-        message_type = message.get("type")
+        await self._message_handlers[type(message)](websocket, conn_info, message)
+    
+    async def _handle_ping(self, websocket: WebSocket, conn_info: ConnectionInfo, message: PingMessage):
+        """Record the ping and answer with a pong"""
+        conn_info.last_ping = utcnow()
+        await self.send_direct(websocket, PONG_FRAME)
+    
+    async def _handle_intervention_response(self, websocket: WebSocket, conn_info: ConnectionInfo,
+                                            message: InterventionResponseMessage):
+        """Record a client's intervention decision and echo it to the session"""
+        session_id = conn_info.session_id
+        if message.intervention_id not in self._interventions.get(session_id, ()):
+            logger.warning("Ignoring response to unknown intervention in session %s", session_id)
+            await self.send_direct(websocket, UNKNOWN_INTERVENTION_FRAME)
+            return
         
-        if message_type == "ping":
-            # Update last ping time
-            conn_info.last_ping = datetime.utcnow()
-            await self._send_direct(websocket, {"type": "pong"})
-            
-        elif message_type == "intervention_response":
-            # Handle intervention response
-            # This would trigger an event that the waiting intervention request can receive
-            pass
-            
-        else:
-            logger.warning(f"Unknown message type: {message_type}")
+        record = {
+            "intervention_id": message.intervention_id,
+            "response": message.response,
+            "connection_id": conn_info.connection_id,
+            "received_at": utcnow()
+        }
+        
+        responses = self._intervention_responses.get(session_id)
+        if responses is None:
+            responses = self._intervention_responses[session_id] = deque(maxlen=MAX_INTERVENTION_RESPONSES)
+        responses.append(record)
+        
+        # The first response of a burst schedules the echo; responses arriving
+        # before it runs ride along in the same frames
+        unsent = self._unsent_responses.setdefault(session_id, [])
+        unsent.append(record)
+        if len(unsent) == 1:
+            task = asyncio.ensure_future(self._flush_intervention_responses(session_id))
+            self._flush_tasks.add(task)
+            task.add_done_callback(self._flush_tasks.discard)
+    
+    async def _flush_intervention_responses(self, session_id: str):
+        """Broadcast a session's pending intervention responses in batches"""
+        unsent = self._unsent_responses.pop(session_id, [])
+        for start in range(0, len(unsent), MAX_INTERVENTION_BATCH):
+            await self.broadcast_to_session(session_id, {
+                "type": "batch_interventions",
+                "session_id": session_id,
+                "items": unsent[start:start + MAX_INTERVENTION_BATCH]
+            })
     
     def get_session_info(self, session_id: str) -> Dict[str, Any]:
         """Get information about a session"""
         return {
             "session_id": session_id,
-            "active": session_id in self._active_sessions,
+            "active": session_id in self._connections,
             "connection_count": len(self._connections.get(session_id, [])),
-            "queued_messages": len(self._message_queue.get(session_id, []))
+            "queued_messages": len(self._message_queue.get(session_id, [])),
+            "intervention_count": len(self._interventions.get(session_id, []))
         }
     
+    def get_interventions(self, session_id: str, intervention_type: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Get intervention requests raised for a session
+        
+        Args:
+            session_id: Target session ID
+            intervention_type: Optional type to filter by
+            
+        Returns:
+            Intervention requests in the order they were raised
+        """
+        interventions = self._interventions.get(session_id, {})
+        if intervention_type is None:
+            return list(interventions.values())
+        
+        intervention_ids = self._interventions_by_type.get(session_id, {}).get(intervention_type, ())
+        return [interventions[intervention_id] for intervention_id in intervention_ids]
+    
+    def get_intervention_responses(self, session_id: str) -> List[Dict[str, Any]]:
+        """Get the intervention responses received for a session, oldest first"""
+        return list(self._intervention_responses.get(session_id, ()))
+    
+    def has_connections(self, session_id: str) -> bool:
+        """Check whether a session has at least one open connection"""
+        return bool(self._connections.get(session_id))
+    
+    async def run_while_connected(self, session_id: str, work: Awaitable[T],
+                                  grace_period: float = ABANDON_GRACE_PERIOD) -> T:
+        """
+        Run work for a session, cancelling it if every client stays disconnected
+        
+        Args:
+            session_id: Session the work reports to
+            work: Coroutine to run
+            grace_period: Seconds the session may have no connections before
+                the work is cancelled
+            
+        Returns:
+            The result of work
+            
+        Raises:
+            SessionAbandonedError: If the session lost all connections first
+        """
+        task = asyncio.ensure_future(work)
+        
+        # Only watch sessions that had listeners to begin with
+        if not self.has_connections(session_id):
+            return await task
+        
+        # Watched sessions keep their state past IDLE_SESSION_TTL
+        self._watchers[session_id] = self._watchers.get(session_id, 0) + 1
+        abandoned = False
+        disconnected_at: Optional[float] = None
+        try:
+            while True:
+                done, _ = await asyncio.wait({task}, timeout=WATCHDOG_INTERVAL)
+                if done:
+                    return task.result()
+                
+                # A client that reconnects within the grace period resumes
+                # the session, so only a sustained absence abandons it
+                if self.has_connections(session_id):
+                    disconnected_at = None
+                    continue
+                now = time.monotonic()
+                if disconnected_at is None:
+                    disconnected_at = now
+                if now - disconnected_at >= grace_period:
+                    logger.info("Cancelling work for abandoned session %s", session_id)
+                    abandoned = True
+                    task.cancel()
+                    await asyncio.gather(task, return_exceptions=True)
+                    raise SessionAbandonedError(session_id)
+        finally:
+            # Don't leave the work running if our caller was cancelled
+            if not task.done():
+                task.cancel()
+            
+            self._watchers[session_id] -= 1
+            if not self._watchers[session_id]:
+                del self._watchers[session_id]
+                # Nobody is left to answer the abandoned session's interventions
+                if abandoned and not self.has_connections(session_id):
+                    self._idle_since.pop(session_id, None)
+                    self._clear_session_state(session_id)
+    
     def get_all_sessions(self) -> list[str]:
         """Get all active session IDs"""
-        return list(self._active_sessions)
+        return list(self._connections)
+    
+    def get_sessions_snapshot(self) -> List[Dict[str, Any]]:
+        """Get info for all active sessions, rebuilt at most once per SESSION_SNAPSHOT_TTL"""
+        now = time.monotonic()
+        built_at, snapshot = self._sessions_snapshot
+        if now - built_at > SESSION_SNAPSHOT_TTL:
+            snapshot = [self.get_session_info(session_id) for session_id in self._connections]
+            self._sessions_snapshot = (now, snapshot)
+        return snapshot
 
 
 # Global WebSocket manager instance
@@ -0,0 +1,24 @@
+"""
+Shared Anthropic clients
+One client, and with it one HTTP connection pool, per API key so processors
+created per request reuse warm connections
+"""
+
+import threading
+from typing import Dict
+
+from anthropic import Anthropic
+
+_clients: Dict[str, Anthropic] = {}
+_clients_lock = threading.Lock()
+
+
+def get_anthropic_client(api_key: str) -> Anthropic:
+    """Return the shared client for an API key, creating it on first use"""
+    client = _clients.get(api_key)
+    if client is None:
+        with _clients_lock:
+            client = _clients.get(api_key)
+            if client is None:
+                client = _clients[api_key] = Anthropic(api_key=api_key)
+    return client
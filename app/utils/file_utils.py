@@ -34,10 +34,7 @@ class FileProcessor:
             pdf_file = BytesIO(file_content)
             pdf_reader = PyPDF2.PdfReader(pdf_file)
             
-            text = ""
-            for page in pdf_reader.pages:
-                text += page.extract_text() + "\n"
-            
+            text = "\n".join(page.extract_text() for page in pdf_reader.pages)
             return text.strip()
             
         except Exception as e:
@@ -51,10 +48,7 @@ class FileProcessor:
             docx_file = BytesIO(file_content)
             doc = docx.Document(docx_file)
             
-            text = ""
-            for paragraph in doc.paragraphs:
-                text += paragraph.text + "\n"
-            
+            text = "\n".join(paragraph.text for paragraph in doc.paragraphs)
             return text.strip()
             
         except Exception as e:
@@ -0,0 +1,56 @@
+"""
+Rate-limited logging for hot failure paths
+Caps how many records a failure loop can emit while still reporting how many
+were dropped
+"""
+
+import logging
+import time
+
+
+class TokenBucket:
+    """Token bucket that refills at ``rate`` tokens per second up to ``burst``"""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self.dropped = 0
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+
+    def try_acquire(self) -> bool:
+        """Take a token if one is available; count a drop otherwise"""
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+        if self._tokens >= 1.0:
+            self._tokens -= 1.0
+            return True
+
+        self.dropped += 1
+        return False
+
+
+def log_sampled(logger: logging.Logger, bucket: TokenBucket, level: int, msg: str, *args,
+                exc_info=None):
+    """
+    Log a %-style message if the bucket allows it
+
+    Args:
+        logger: Target logger
+        bucket: Token bucket shared by the call sites being sampled
+        level: Logging level
+        msg: Format string, with args applied lazily
+        exc_info: Passed through to the logger
+
+    Records are attributed to the caller rather than to this module.
+    """
+    if not logger.isEnabledFor(level) or not bucket.try_acquire():
+        return
+
+    if bucket.dropped:
+        msg += " (%d similar messages suppressed)"
+        args += (bucket.dropped,)
+        bucket.dropped = 0
+    logger.log(level, msg, *args, exc_info=exc_info, stacklevel=2)
@@ -0,0 +1,102 @@
+"""
+In-memory TTL cache for read-only GET endpoints
+Serves repeat hits without re-running the handler and falls back to the last
+good value if the handler fails
+"""
+
+import logging
+import time
+from collections import OrderedDict
+from functools import wraps
+from typing import Any, Awaitable, Callable, Hashable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class TTLCache:
+    """Small LRU cache whose entries expire after a fixed time-to-live"""
+
+    def __init__(self, ttl: float, maxsize: int = 128):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+
+    def get(self, key: Hashable, allow_stale: bool = False) -> Tuple[bool, Any]:
+        """
+        Look up a cached value
+
+        Args:
+            key: Cache key
+            allow_stale: Return the value even if it has expired
+
+        Returns:
+            (found, value) tuple
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return False, None
+
+        expires_at, value = entry
+        if not allow_stale and expires_at <= time.monotonic():
+            return False, None
+
+        self._entries.move_to_end(key)
+        return True, value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        """Store a value, evicting the least recently used entry when full"""
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        """Drop all cached values"""
+        self._entries.clear()
+
+
+def cached_response(ttl: float, maxsize: int = 128,
+                    key_builder: Optional[Callable[..., Hashable]] = None):
+    """
+    Cache the result of an async endpoint for ``ttl`` seconds
+
+    Args:
+        ttl: Time-to-live in seconds
+        maxsize: Maximum number of distinct keys kept
+        key_builder: Optional function mapping the endpoint kwargs to a key
+
+    Returns:
+        Decorator for async endpoint functions
+    """
+    def decorator(func: Callable[..., Awaitable[Any]]):
+        cache = TTLCache(ttl, maxsize)
+
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            if key_builder:
+                key = key_builder(*args, **kwargs)
+            else:
+                key = (args, tuple(sorted(kwargs.items())))
+
+            found, value = cache.get(key)
+            if found:
+                return value
+
+            try:
+                value = await func(*args, **kwargs)
+            except Exception as e:
+                # Serve the last good value rather than failing the request
+                found, value = cache.get(key, allow_stale=True)
+                if found:
+                    logger.warning("Serving stale response for %s: %s", func.__name__, e)
+                    return value
+                raise
+
+            cache.set(key, value)
+            return value
+
+        wrapper.cache = cache
+        return wrapper
+
+    return decorator
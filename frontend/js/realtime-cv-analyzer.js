@@ -10,6 +10,7 @@ class RealtimeCVAnalyzer {
         this.processSteps = [];
         this.isAnalyzing = false;
         this.interventionPromise = null;
+        this.textDecoder = new TextDecoder();
         
         this.initializeUI();
         this.bindEvents();
@@ -455,6 +456,8 @@ class RealtimeCVAnalyzer {
         
         try {
             this.websocket = new WebSocket(wsUrl);
+            // Server sends pre-encoded JSON as binary frames
+            this.websocket.binaryType = 'arraybuffer';
             
             this.websocket.onopen = () => {
                 console.log('WebSocket connected');
@@ -463,7 +466,8 @@ class RealtimeCVAnalyzer {
             };
             
             this.websocket.onmessage = (event) => {
-                const message = JSON.parse(event.data);
+                const raw = typeof event.data === 'string' ? event.data : this.textDecoder.decode(event.data);
+                const message = JSON.parse(raw);
                 this.handleWebSocketMessage(message);
             };
             
@@ -570,6 +574,11 @@ class RealtimeCVAnalyzer {
         console.log('WebSocket message:', message);
         
         switch (message.type) {
+            case 'batch':
+                // Several queued messages delivered in one frame
+                message.messages.forEach(inner => this.handleWebSocketMessage(inner));
+                break;
+                
             case 'connection_established':
                 console.log('Connection established:', message.connection_id);
                 break;
@@ -582,6 +591,10 @@ class RealtimeCVAnalyzer {
                 this.handleInterventionRequest(message.data);
                 break;
                 
+            case 'batch_interventions':
+                this.handleInterventionResponses(message.items);
+                break;
+                
             case 'error':
                 console.error('WebSocket error:', message.error);
                 break;
@@ -673,6 +686,14 @@ class RealtimeCVAnalyzer {
         this.currentInterventionId = interventionData.intervention_id;
     }
     
+    handleInterventionResponses(items) {
+        // Another client may have answered the request shown here
+        if (items.some(item => item.intervention_id === this.currentInterventionId)) {
+            document.getElementById('intervention-panel').style.display = 'none';
+            this.currentInterventionId = null;
+        }
+    }
+    
     respondToIntervention(response) {
         if (!this.currentInterventionId) return;
         
@@ -30,7 +30,8 @@ def test_core_imports():
         print("✅ Data models import successfully")
         
         # Test configuration
-        from app.config import settings
+        from app.config import get_settings
+        get_settings()
         print("✅ Configuration loads successfully")
         
         return True
@@ -111,7 +112,8 @@ def test_configuration():
     print("\n⚙️ Testing Configuration...")
     
     try:
-        from app.config import settings
+        from app.config import get_settings
+        settings = get_settings()
         
         print(f"✅ App name: {settings.app_name}")
         print(f"✅ Debug mode: {settings.debug}")
@@ -84,4 +84,24 @@ def test_experience_match_calculation():
     
     # Test below requirements
     score = processor._calculate_experience_match(2.0, 4.0)
-    assert score == 50.0
\ No newline at end of file
+    assert score == 50.0
+
+
+def test_skill_sets_do_not_affect_equality():
+    job = JobRequirements(
+        title="Developer",
+        company="Tech Corp",
+        description="Build things",
+        required_skills=["Python", "SQL"],
+        preferred_skills=["React"]
+    )
+    same_job = job.model_copy(deep=True)
+
+    assert job.required_skill_set == {"python", "sql"}
+    assert job.preferred_skill_set == {"react"}
+    assert job == same_job
+
+    cv = CandidateCV(name="John Doe", contact=ContactInfo(), skills=["Python"])
+    same_cv = cv.model_copy(deep=True)
+    assert cv.skill_set == {"python"}
+    assert cv == same_cv
@@ -2,8 +2,11 @@
 
 import pytest
 import asyncio
-from app.services.enhanced_cv_processor import EnhancedCVProcessor
-from app.models.cv_models import JobRequirements
+from types import SimpleNamespace
+from app.services.enhanced_cv_processor import (
+    EnhancedCVProcessor, _result_cache, _inflight_parses, _keyword_hits_cache
+)
+from app.models.cv_models import CandidateCV, ContactInfo, JobRequirements
 
 # Sample digital media CV with enhanced skills
 SAMPLE_DIGITAL_MEDIA_CV = """
@@ -102,13 +105,13 @@ Responsibilities:
 
 class TestEnhancedCVProcessor:
     
-    @pytest.fixture
+    @pytest.fixture(scope="module")
     def enhanced_processor(self):
         """Create enhanced CV processor instance"""
         # Use a test API key - in real tests, use a test environment
         return EnhancedCVProcessor(api_key="test_api_key")
     
-    @pytest.fixture
+    @pytest.fixture(scope="module")
     def sample_job_requirements(self):
         """Create sample job requirements"""
         return JobRequirements(
@@ -244,6 +247,123 @@ class TestEnhancedCVProcessor:
             detected = enhanced_processor._detect_skills_by_category(cv_text.lower(), category)
             assert any(expected_skill in skill for skill in detected), f"Failed to detect {expected_skill} in {cv_text}"
 
+class TestEnhancedCVProcessorCaching:
+    
+    @pytest.fixture
+    def job_requirements(self):
+        return JobRequirements(
+            title="Digital Marketing Manager",
+            company="HealthTech Corp",
+            description=SAMPLE_JOB_DESCRIPTION,
+            required_skills=["technical seo", "sql"]
+        )
+    
+    @pytest.fixture
+    def processor(self, monkeypatch):
+        """Processor whose Claude parse is replaced by a counted, slightly slow stub"""
+        _result_cache.clear()
+        processor = EnhancedCVProcessor(api_key="test_api_key")
+        processor.parses = []
+        
+        async def fake_parse(cv_text):
+            processor.parses.append(cv_text)
+            await asyncio.sleep(0.01)
+            return CandidateCV(name="John Smith", contact=ContactInfo(), skills=["sql", "technical seo"])
+        
+        monkeypatch.setattr(processor, "_parse_cv_with_claude", fake_parse)
+        yield processor
+        _result_cache.clear()
+    
+    @pytest.mark.asyncio
+    async def test_result_cache_hit(self, processor, job_requirements):
+        cv_data, score = await processor.process_enhanced_cv(SAMPLE_DIGITAL_MEDIA_CV, job_requirements)
+        
+        # Whitespace differences map to the same cache entry
+        reformatted_cv = "  ".join(SAMPLE_DIGITAL_MEDIA_CV.split())
+        cached_cv, cached_score = await processor.process_enhanced_cv(reformatted_cv, job_requirements)
+        
+        assert len(processor.parses) == 1
+        assert cached_cv == cv_data and cached_cv is not cv_data
+        assert cached_score == score
+    
+    @pytest.mark.asyncio
+    async def test_result_cache_miss(self, processor, job_requirements):
+        await processor.process_enhanced_cv(SAMPLE_DIGITAL_MEDIA_CV, job_requirements)
+        
+        other_job = job_requirements.model_copy(update={"title": "SEO Lead"})
+        await processor.process_enhanced_cv(SAMPLE_DIGITAL_MEDIA_CV, other_job)
+        await processor.process_enhanced_cv(SAMPLE_DIGITAL_MEDIA_CV, job_requirements, use_cache=False)
+        
+        assert len(processor.parses) == 3
+    
+    @pytest.mark.asyncio
+    async def test_result_cache_entry_expires(self, processor, job_requirements):
+        processor.cache_ttl_hours = 0.1 / 3600
+        await processor.process_enhanced_cv(SAMPLE_DIGITAL_MEDIA_CV, job_requirements)
+        await asyncio.sleep(0.15)
+        await processor.process_enhanced_cv(SAMPLE_DIGITAL_MEDIA_CV, job_requirements)
+        
+        assert len(processor.parses) == 2
+    
+    @pytest.mark.asyncio
+    async def test_concurrent_parses_coalesce(self, processor):
+        results = await asyncio.gather(*(
+            processor._extract_enhanced_cv_data(SAMPLE_DIGITAL_MEDIA_CV) for _ in range(5)
+        ))
+        
+        assert len(processor.parses) == 1
+        assert all(result == results[0] for result in results)
+        # Each caller gets its own copy to enhance
+        assert len({id(result) for result in results}) == 5
+        assert _inflight_parses == {}
+    def test_keyword_hits_cached_by_digest(self, processor):
+        _keyword_hits_cache.clear()
+        cv_data = CandidateCV(name="John Smith", contact=ContactInfo())
+        
+        enhanced = processor._enhance_with_advanced_patterns(cv_data, SAMPLE_DIGITAL_MEDIA_CV)
+        
+        assert "technical seo" in enhanced.seo_sem_expertise
+        # One scan shared by every category, and no CV text kept in the cache
+        (key,) = _keyword_hits_cache._entries
+        assert isinstance(key, bytes) and len(key) == 16
+        _keyword_hits_cache.clear()
+
+class TestEnhancedCVProcessorPromptCaching:
+    
+    @pytest.fixture
+    def processor(self):
+        """Processor whose Claude client records requests and answers with a fixed parse"""
+        processor = EnhancedCVProcessor(api_key="test_api_key")
+        processor.requests = []
+        
+        def create(**kwargs):
+            processor.requests.append(kwargs)
+            return SimpleNamespace(
+                content=[SimpleNamespace(text='{"name": "John Smith", "contact": {}}')],
+                usage=SimpleNamespace(cache_read_input_tokens=1200, cache_creation_input_tokens=0)
+            )
+        
+        processor.client = SimpleNamespace(messages=SimpleNamespace(create=create))
+        return processor
+    
+    @pytest.mark.asyncio
+    async def test_instructions_sent_as_cached_system_prompt(self, processor):
+        cv_data = await processor._parse_cv_with_claude(SAMPLE_DIGITAL_MEDIA_CV)
+        await processor._parse_cv_with_claude("Jane Doe\nSEO Lead")
+        
+        assert cv_data.name == "John Smith"
+        first, second = processor.requests
+        # Caching needs a byte-identical prefix, so the CV goes after it
+        assert first["system"] == second["system"]
+        assert first["system"][-1]["cache_control"] == {"type": "ephemeral"}
+        assert "John Smith" not in first["system"][-1]["text"]
+        assert first["messages"] == [{"role": "user", "content": "CV Text:\n" + SAMPLE_DIGITAL_MEDIA_CV}]
+    
+    def test_model_is_configurable(self):
+        processor = EnhancedCVProcessor(api_key="test_api_key", model="configured-model")
+        
+        assert processor.model == "configured-model"
+
 if __name__ == "__main__":
     # Run basic tests without pytest
     processor = EnhancedCVProcessor(api_key="test_key")
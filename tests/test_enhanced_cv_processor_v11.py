@@ -0,0 +1,308 @@
+"""Test cases for the real-time (v1.1) CV processor"""
+
+import asyncio
+import pytest
+from fastapi.testclient import TestClient
+from app.middleware import rate_limiting
+from app.services import enhanced_cv_processor_v11
+from app.services.enhanced_cv_processor import EnhancedCVProcessor
+from app.services.enhanced_cv_processor_v11 import (
+    EnhancedCVProcessorV11, ProcessHistoryEntry, _gather_steps, _realtime_result_cache
+)
+from app.models.cv_models import CandidateCV, ContactInfo, JobRequirements
+from app.explainers.process_explainer import ProcessExplainer, ProcessStep, process_explainer
+
+SAMPLE_CV = """
+Jane Doe
+Digital Marketing Lead
+
+PROFESSIONAL SUMMARY:
+SEO and analytics specialist.
+
+EXPERIENCE:
+Marketing Lead | Acme | 2019-Present
+
+EDUCATION:
+BSc Marketing, 2018
+
+SKILLS:
+Python, SQL, Google Ads
+"""
+
+# Steps run by process_enhanced_cv_with_updates
+PIPELINE_STEPS = 13
+
+
+@pytest.fixture
+def job_requirements():
+    return JobRequirements(
+        title="Marketing Lead",
+        company="Acme",
+        description="Lead our SEO and paid media work",
+        required_skills=["python", "sql"],
+        preferred_skills=["seo"]
+    )
+
+
+def _stub_processor(monkeypatch, cache_ttl_hours=0):
+    """Processor whose Claude parse is replaced by a fixed result"""
+    processor = EnhancedCVProcessorV11(api_key="test-key", cache_ttl_hours=cache_ttl_hours)
+    parses = []
+
+    async def fake_parse(cv_text):
+        parses.append(cv_text)
+        return CandidateCV(name="Jane Doe", contact=ContactInfo(), skills=["python", "seo"])
+
+    monkeypatch.setattr(processor, "_parse_cv_with_claude", fake_parse)
+    processor.parses = parses
+    return processor
+
+
+@pytest.fixture
+def processor(monkeypatch):
+    return _stub_processor(monkeypatch)
+
+
+@pytest.fixture
+def cached_processor(monkeypatch):
+    _realtime_result_cache.clear()
+    yield _stub_processor(monkeypatch, cache_ttl_hours=1)
+    _realtime_result_cache.clear()
+
+
+@pytest.fixture
+def client(monkeypatch):
+    """Test client whose Claude parses return a fixed CV"""
+    from app.main import app
+    parses = []
+
+    async def fake_parse(self, cv_text):
+        parses.append(cv_text)
+        return CandidateCV(name="Jane Doe", contact=ContactInfo(), skills=["python", "seo"])
+
+    monkeypatch.setattr(EnhancedCVProcessor, "_parse_cv_with_claude", fake_parse)
+    monkeypatch.setattr(enhanced_cv_processor_v11, "UI_UPDATE_DELAY", 0)
+    # Each test starts with the default allowance
+    monkeypatch.setattr(rate_limiting, "rate_limiter", rate_limiting.RateLimiter())
+    _realtime_result_cache.clear()
+    test_client = TestClient(app)
+    test_client.parses = parses
+    yield test_client
+    _realtime_result_cache.clear()
+
+
+ANALYSIS_REQUEST = {
+    "cv_text": SAMPLE_CV,
+    "job_description": "Senior marketing lead with Python and SQL"
+}
+
+
+def test_realtime_endpoint_scores_parsed_cv(client):
+    response = client.post("/api/analyze-realtime?session_id=session-1", json=ANALYSIS_REQUEST)
+
+    assert response.status_code == 200
+    result = response.json()
+    assert result["candidate_name"] == "Jane Doe"
+    # One of two required skills, and no preferred skills to miss
+    assert result["skills_match"] == 60.0
+    assert result["analysis"]["skills_match"]["missing_skills"] == ["sql"]
+    assert result["analysis"]["experience_match"]["required_years"] == 5
+    assert result["recommendation"]
+    assert "Ask how they would cover the missing sql requirement" in result["suggested_interview_questions"]
+
+
+def test_realtime_endpoint_matches_enhanced_overall_score(client):
+    realtime = client.post("/api/analyze-realtime?session_id=session-1&no_cache=true", json=ANALYSIS_REQUEST)
+    enhanced = client.post("/api/analyze-enhanced?no_cache=true", json=ANALYSIS_REQUEST)
+
+    assert realtime.status_code == enhanced.status_code == 200
+    assert realtime.json()["overall_score"] == enhanced.json()["overall_score"]
+
+
+def test_realtime_endpoint_serves_repeat_from_cache(client):
+    first = client.post("/api/analyze-realtime?session_id=session-1", json=ANALYSIS_REQUEST)
+    second = client.post("/api/analyze-realtime?session_id=session-2", json=ANALYSIS_REQUEST)
+
+    assert first.status_code == second.status_code == 200
+    assert second.json() == first.json()
+    assert len(client.parses) == 1
+
+
+def test_realtime_endpoint_no_cache_reruns_analysis(client):
+    for _ in range(2):
+        response = client.post("/api/analyze-realtime?session_id=session-1&no_cache=true", json=ANALYSIS_REQUEST)
+        assert response.status_code == 200
+
+    assert len(client.parses) == 2
+
+
+@pytest.mark.asyncio
+async def test_pipeline_runs_without_session(processor, job_requirements):
+    cv_data, scores = await processor.process_enhanced_cv_with_updates(
+        SAMPLE_CV, job_requirements, session_id=None
+    )
+
+    assert isinstance(cv_data, CandidateCV)
+    assert scores.suggested_interview_questions
+    assert len(processor.parses) == 1
+
+
+@pytest.mark.asyncio
+async def test_failed_step_cancels_running_siblings():
+    cancelled = asyncio.Event()
+
+    async def slow_step():
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    async def failing_step():
+        await asyncio.sleep(0)
+        raise ValueError("step failed")
+
+    with pytest.raises(ValueError, match="step failed"):
+        await asyncio.wait_for(_gather_steps(slow_step(), failing_step()), 1)
+    assert cancelled.is_set()
+
+
+@pytest.mark.asyncio
+async def test_gather_steps_keeps_result_order():
+    async def step(value, delay):
+        await asyncio.sleep(delay)
+        return value
+
+    assert await _gather_steps(step("a", 0.02), step("b", 0)) == ["a", "b"]
+
+
+@pytest.mark.asyncio
+async def test_step_failure_stops_other_steps(processor, job_requirements, monkeypatch):
+    finished = []
+
+    async def slow_leadership(cv_data):
+        await asyncio.sleep(10)
+        finished.append("leadership")
+        return {}, {}
+
+    async def failing_education(cv_data, job_requirements):
+        raise RuntimeError("education failed")
+
+    monkeypatch.setattr(processor, "_evaluate_leadership_with_timing", slow_leadership)
+    monkeypatch.setattr(processor, "_evaluate_education_with_timing", failing_education)
+
+    with pytest.raises(RuntimeError, match="education failed"):
+        await asyncio.wait_for(
+            processor.process_enhanced_cv_with_updates(SAMPLE_CV, job_requirements, session_id=None),
+            1
+        )
+    assert finished == []
+    assert ProcessStep.LEADERSHIP_EVALUATION not in {
+        entry.step for entry in processor.process_history
+    }
+
+
+@pytest.mark.asyncio
+async def test_repeat_analysis_served_from_cache(cached_processor, job_requirements):
+    cv_data, scores = await cached_processor.process_enhanced_cv_with_updates(
+        SAMPLE_CV, job_requirements, session_id=None
+    )
+    cv_data.name = "Changed by caller"
+
+    cached_cv, cached_scores = await cached_processor.process_enhanced_cv_with_updates(
+        SAMPLE_CV, job_requirements, session_id=None
+    )
+
+    assert cached_processor.parses == [SAMPLE_CV]
+    assert cached_cv.name == "Jane Doe"
+    assert cached_scores == scores
+
+
+@pytest.mark.asyncio
+async def test_use_cache_false_reruns_analysis(cached_processor, job_requirements):
+    for _ in range(2):
+        await cached_processor.process_enhanced_cv_with_updates(
+            SAMPLE_CV, job_requirements, session_id=None, use_cache=False
+        )
+
+    assert len(cached_processor.parses) == 2
+
+
+def test_processors_share_one_explainer(monkeypatch):
+    first = _stub_processor(monkeypatch)
+    second = _stub_processor(monkeypatch)
+
+    assert first.explainer is second.explainer is process_explainer
+
+
+def _count_display_calls(processor, monkeypatch):
+    """Record updates instead of sending them and count display formatting"""
+    calls = []
+    updates = []
+    format_for_display = ProcessExplainer.format_for_display
+
+    def counting_format(self, explanation, *args, **kwargs):
+        calls.append(explanation.step_name)
+        return format_for_display(self, explanation, *args, **kwargs)
+
+    async def record_update(session_id, update):
+        updates.append(update)
+
+    async def no_intervention(**kwargs):
+        return None
+
+    monkeypatch.setattr(ProcessExplainer, "format_for_display", counting_format)
+    monkeypatch.setattr(enhanced_cv_processor_v11.websocket_manager, "send_process_update", record_update)
+    monkeypatch.setattr(enhanced_cv_processor_v11, "UI_UPDATE_DELAY", 0)
+    monkeypatch.setattr(processor, "_request_intervention", no_intervention)
+    return calls, updates
+
+
+@pytest.mark.asyncio
+async def test_display_formatting_skipped_without_session(processor, job_requirements, monkeypatch):
+    calls, updates = _count_display_calls(processor, monkeypatch)
+
+    await processor.process_enhanced_cv_with_updates(SAMPLE_CV, job_requirements, session_id=None)
+
+    assert calls == []
+    assert updates == []
+
+
+@pytest.mark.asyncio
+async def test_display_formatting_sent_with_session(processor, job_requirements, monkeypatch):
+    calls, updates = _count_display_calls(processor, monkeypatch)
+
+    await processor.process_enhanced_cv_with_updates(SAMPLE_CV, job_requirements, session_id="session-1")
+
+    completed = [update for update in updates if update.status == "completed"]
+    assert len(calls) == len(completed) == PIPELINE_STEPS
+    assert all(update.details for update in completed)
+
+
+@pytest.mark.asyncio
+async def test_process_history_keeps_latest_steps(monkeypatch, job_requirements):
+    monkeypatch.setattr(enhanced_cv_processor_v11, "MAX_PROCESS_HISTORY", 3)
+    processor = _stub_processor(monkeypatch)
+
+    await processor.process_enhanced_cv_with_updates(SAMPLE_CV, job_requirements, session_id=None)
+
+    assert len(processor.process_history) == 3
+    assert processor.process_history[-1].step == ProcessStep.FINAL_REVIEW
+
+
+@pytest.mark.asyncio
+async def test_process_history_entries_are_compact(processor, job_requirements):
+    await processor.process_enhanced_cv_with_updates(SAMPLE_CV, job_requirements, session_id=None)
+
+    entry = processor.process_history[-1]
+    assert isinstance(entry, ProcessHistoryEntry)
+    assert not hasattr(entry, "__dict__")
+    assert entry.explanation.step_name
+    assert entry.details == {"completeness": 0.25, "missing_sections": ["contact", "experience", "education"]}
+
+
+def test_identify_sections(processor):
+    sections = processor._identify_sections(SAMPLE_CV)
+
+    assert set(sections) == {"experience", "education", "skills", "summary"}
+    assert processor._identify_sections("no headings here") == {}
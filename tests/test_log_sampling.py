@@ -0,0 +1,58 @@
+import logging
+from app.utils.log_sampling import TokenBucket, log_sampled
+
+logger = logging.getLogger("tests.log_sampling")
+
+
+def test_bucket_allows_burst_then_drops():
+    bucket = TokenBucket(rate=1, burst=3)
+
+    assert [bucket.try_acquire() for _ in range(5)] == [True, True, True, False, False]
+    assert bucket.dropped == 2
+
+
+def test_bucket_refills_over_time():
+    bucket = TokenBucket(rate=2, burst=3)
+    for _ in range(3):
+        bucket.try_acquire()
+    assert not bucket.try_acquire()
+
+    # Half a second at 2 tokens/s buys one more call
+    bucket._updated -= 0.5
+    assert bucket.try_acquire()
+    assert not bucket.try_acquire()
+
+
+def test_bucket_refill_capped_at_burst():
+    bucket = TokenBucket(rate=10, burst=2)
+    bucket._updated -= 60
+
+    assert [bucket.try_acquire() for _ in range(3)] == [True, True, False]
+
+
+def test_log_sampled_reports_suppressed_count(caplog):
+    bucket = TokenBucket(rate=1, burst=1)
+    with caplog.at_level(logging.ERROR, logger=logger.name):
+        log_sampled(logger, bucket, logging.ERROR, "failed: %s", "first")
+        log_sampled(logger, bucket, logging.ERROR, "failed: %s", "dropped")
+        bucket._updated -= 1
+        log_sampled(logger, bucket, logging.ERROR, "failed: %s", "third")
+
+    assert [record.getMessage() for record in caplog.records] == [
+        "failed: first",
+        "failed: third (1 similar messages suppressed)"
+    ]
+
+
+def test_log_sampled_attributes_record_to_caller(caplog):
+    bucket = TokenBucket(rate=1, burst=1)
+    with caplog.at_level(logging.ERROR, logger=logger.name):
+        try:
+            raise ValueError("boom")
+        except ValueError as e:
+            log_sampled(logger, bucket, logging.ERROR, "failed: %s", e, exc_info=True)
+
+    record = caplog.records[0]
+    assert record.filename == "test_log_sampling.py"
+    assert record.funcName == "test_log_sampled_attributes_record_to_caller"
+    assert record.exc_info[0] is ValueError
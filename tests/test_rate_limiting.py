@@ -67,4 +67,49 @@ def test_cleanup_old_calls():
     assert not limiter.is_rate_limited(client_ip)
     
     # Old call should be removed
-    assert len(limiter.calls[client_ip]) == 0
\ No newline at end of file
+    assert len(limiter.calls[client_ip]) == 0
+
+
+def test_call_at_window_start_has_expired():
+    limiter = RateLimiter(max_calls=1, window_hours=1)
+    client_ip = "192.168.1.5"
+    now = datetime(2024, 1, 1, 12, 0)
+    
+    # A call exactly one window old no longer counts
+    limiter.calls[client_ip] = [now - timedelta(hours=1)]
+    assert not limiter.is_rate_limited(client_ip, now)
+    
+    # One just inside the window still does
+    limiter.calls[client_ip] = [now - timedelta(hours=1) + timedelta(microseconds=1)]
+    assert limiter.is_rate_limited(client_ip, now)
+
+def test_only_expired_calls_trimmed():
+    limiter = RateLimiter(max_calls=5, window_hours=1)
+    client_ip = "192.168.1.6"
+    now = datetime(2024, 1, 1, 12, 0)
+    window_start = now - timedelta(hours=1)
+    limiter.calls[client_ip] = [
+        window_start - timedelta(minutes=5),
+        window_start,
+        window_start + timedelta(minutes=5),
+        now
+    ]
+    
+    assert not limiter.is_rate_limited(client_ip, now)
+    assert limiter.calls[client_ip] == [window_start + timedelta(minutes=5), now]
+
+def test_zero_max_calls_always_limited():
+    limiter = RateLimiter(max_calls=0, window_hours=24)
+    
+    assert limiter.is_rate_limited("192.168.1.7")
+
+def test_idle_clients_pruned_on_record():
+    limiter = RateLimiter(max_calls=5, window_hours=1)
+    start = datetime(2024, 1, 1, 12, 0)
+    limiter.record_call("192.168.1.8", start)
+    limiter.record_call("192.168.1.9", start + timedelta(minutes=50))
+    
+    # 90 minutes in, only clients with a call inside the window remain
+    limiter.record_call("192.168.1.10", start + timedelta(hours=1, minutes=30))
+    
+    assert set(limiter.calls) == {"192.168.1.9", "192.168.1.10"}
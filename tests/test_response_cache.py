@@ -0,0 +1,52 @@
+import time
+import pytest
+from app.utils.response_cache import TTLCache, cached_response
+
+def test_ttl_cache_hit_and_expiry():
+    cache = TTLCache(ttl=60)
+    cache.set("key", "value")
+    assert cache.get("key") == (True, "value")
+    
+    cache.set("key", "value", ttl=0)
+    assert cache.get("key") == (False, None)
+    # Expired values are still available as a fallback
+    assert cache.get("key", allow_stale=True) == (True, "value")
+
+def test_ttl_cache_evicts_least_recently_used():
+    cache = TTLCache(ttl=60, maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    
+    assert cache.get("b") == (False, None)
+    assert cache.get("a") == (True, 1)
+    assert cache.get("c") == (True, 3)
+
+@pytest.mark.asyncio
+async def test_cached_response_reruns_after_ttl():
+    calls = []
+    
+    @cached_response(ttl=0.05)
+    async def endpoint():
+        calls.append(time.monotonic())
+        return {"calls": len(calls)}
+    
+    assert await endpoint() == {"calls": 1}
+    assert await endpoint() == {"calls": 1}
+    time.sleep(0.06)
+    assert await endpoint() == {"calls": 2}
+
+@pytest.mark.asyncio
+async def test_cached_response_serves_stale_on_failure():
+    fail = []
+    
+    @cached_response(ttl=0)
+    async def endpoint():
+        if fail:
+            raise RuntimeError("backend down")
+        return "fresh"
+    
+    assert await endpoint() == "fresh"
+    fail.append(True)
+    assert await endpoint() == "fresh"
@@ -0,0 +1,397 @@
+"""Test cases for the WebSocket session manager"""
+
+import asyncio
+import orjson
+import pytest
+from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+from app.config import get_settings
+from app.services import websocket_manager as websocket_module
+from app.services.websocket_manager import (
+    WebSocketManager, SessionAbandonedError, InterventionResponseMessage,
+    MAX_BATCH_BYTES, PONG_FRAME, STALLED_CLOSE_CODE
+)
+from app.endpoints import websocket_endpoints
+from app.endpoints.websocket_endpoints import (
+    INVALID_JSON_FRAME, INVALID_MESSAGE_FRAME, UNAUTHORIZED_CLOSE_CODE
+)
+
+
+class FakeWebSocket:
+    """Stands in for a Starlette WebSocket, recording what is sent to it"""
+
+    def __init__(self):
+        self.headers = {}
+        self.sent = []
+        self.close_code = None
+
+    async def accept(self):
+        pass
+
+    async def send_bytes(self, data: bytes):
+        self.sent.append(data)
+
+    async def close(self, code: int = 1000, reason=None):
+        self.close_code = code
+
+
+class SlowWebSocket(FakeWebSocket):
+    """A client whose writes take long enough for messages to pile up"""
+
+    async def send_bytes(self, data: bytes):
+        await asyncio.sleep(0.001)
+        self.sent.append(data)
+
+
+class StalledWebSocket(FakeWebSocket):
+    """A client that never finishes reading a frame"""
+
+    async def send_bytes(self, data: bytes):
+        await asyncio.sleep(10)
+
+
+@pytest.fixture
+def manager(monkeypatch):
+    monkeypatch.setattr(websocket_module, "WATCHDOG_INTERVAL", 0.01)
+    return WebSocketManager()
+
+
+async def _finish(work, delay=0.2, result="done"):
+    await asyncio.sleep(delay)
+    work.append(result)
+    return result
+
+
+@pytest.mark.asyncio
+async def test_work_survives_brief_reconnect(manager):
+    websocket = FakeWebSocket()
+    await manager.connect(websocket, "session-1")
+    finished = []
+
+    runner = asyncio.ensure_future(
+        manager.run_while_connected("session-1", _finish(finished), grace_period=0.1)
+    )
+    await asyncio.sleep(0.03)
+    await manager.disconnect(websocket)
+    await asyncio.sleep(0.05)
+    reconnected = FakeWebSocket()
+    await manager.connect(reconnected, "session-1")
+
+    assert await runner == "done"
+    assert finished == ["done"]
+    await manager.disconnect(reconnected)
+
+
+@pytest.mark.asyncio
+async def test_work_cancelled_after_grace_period(manager):
+    websocket = FakeWebSocket()
+    await manager.connect(websocket, "session-1")
+    finished = []
+
+    runner = asyncio.ensure_future(
+        manager.run_while_connected("session-1", _finish(finished, delay=1), grace_period=0.05)
+    )
+    await asyncio.sleep(0.03)
+    await manager.disconnect(websocket)
+
+    with pytest.raises(SessionAbandonedError):
+        await asyncio.wait_for(runner, 0.5)
+    assert finished == []
+
+
+@pytest.mark.asyncio
+async def test_unwatched_session_runs_to_completion(manager):
+    finished = []
+
+    assert await manager.run_while_connected("no-listeners", _finish(finished, delay=0)) == "done"
+    assert finished == ["done"]
+
+
+@pytest.mark.asyncio
+async def test_interventions_bounded_per_session(manager, monkeypatch):
+    monkeypatch.setattr(websocket_module, "MAX_INTERVENTIONS", 3)
+    websocket = FakeWebSocket()
+    await manager.connect(websocket, "session-1")
+
+    for index, intervention_type in enumerate(["score", "keyword", "score", "keyword", "score"]):
+        await manager.request_intervention("session-1", intervention_type, {"index": index})
+
+    interventions = manager.get_interventions("session-1")
+    assert [item["context"]["index"] for item in interventions] == [2, 3, 4]
+    assert [item["context"]["index"] for item in manager.get_interventions("session-1", "score")] == [2, 4]
+    assert [item["context"]["index"] for item in manager.get_interventions("session-1", "keyword")] == [3]
+    await manager.disconnect(websocket)
+
+
+@pytest.mark.asyncio
+async def test_interventions_kept_until_session_idle_too_long(manager, monkeypatch):
+    first, second = FakeWebSocket(), FakeWebSocket()
+    await manager.connect(first, "session-1")
+    await manager.connect(second, "session-1")
+    await manager.request_intervention("session-1", "score", {})
+
+    await manager.disconnect(first)
+    await manager.disconnect(second)
+    assert len(manager.get_interventions("session-1")) == 1
+
+    monkeypatch.setattr(websocket_module, "IDLE_SESSION_TTL", 0)
+    manager._evict_idle_sessions()
+    assert manager.get_interventions("session-1") == []
+    assert "session-1" not in manager._interventions_by_type
+
+
+@pytest.mark.asyncio
+async def test_unopened_session_evicted_once_idle_too_long(manager, monkeypatch):
+    await manager.request_intervention("never-opened", "score", {})
+    await manager.broadcast_to_session("never-opened", {"type": "process_update"})
+    assert len(manager.get_interventions("never-opened")) == 1
+    assert len(manager._message_queue["never-opened"]) == 2
+
+    monkeypatch.setattr(websocket_module, "IDLE_SESSION_TTL", 0)
+    await manager.broadcast_to_session("another-session", {"type": "process_update"})
+
+    assert manager.get_interventions("never-opened") == []
+    assert "never-opened" not in manager._message_queue
+    assert "never-opened" not in manager._idle_since
+
+
+@pytest.mark.asyncio
+async def test_idle_sessions_bounded(manager, monkeypatch):
+    monkeypatch.setattr(websocket_module, "MAX_IDLE_SESSIONS", 2)
+
+    for session_id in ["session-1", "session-2", "session-3"]:
+        await manager.request_intervention(session_id, "score", {})
+
+    assert manager.get_interventions("session-1") == []
+    assert set(manager._message_queue) == {"session-2", "session-3"}
+    assert list(manager._idle_since) == ["session-2", "session-3"]
+
+
+async def _settle():
+    """Let scheduled flushes and writers run"""
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+@pytest.mark.asyncio
+async def test_response_to_unknown_intervention_rejected(manager):
+    websocket = FakeWebSocket()
+    await manager.connect(websocket, "session-1")
+
+    await manager.handle_client_message(websocket, InterventionResponseMessage(
+        type="intervention_response", intervention_id="made-up", response={"approve": True}
+    ))
+    await _settle()
+
+    assert manager.get_intervention_responses("session-1") == []
+    assert b"Unknown intervention" in b"".join(websocket.sent)
+    await manager.disconnect(websocket)
+
+
+@pytest.mark.asyncio
+async def test_intervention_responses_evicted_once_session_idle(manager, monkeypatch):
+    monkeypatch.setattr(websocket_module, "IDLE_SESSION_TTL", 0)
+    websocket = FakeWebSocket()
+    await manager.connect(websocket, "session-1")
+    await manager.request_intervention("session-1", "score", {})
+    intervention_id = manager.get_interventions("session-1")[0]["intervention_id"]
+
+    await manager.handle_client_message(websocket, InterventionResponseMessage(
+        type="intervention_response", intervention_id=intervention_id, response={"approve": True}
+    ))
+    await _settle()
+    assert [item["response"] for item in manager.get_intervention_responses("session-1")] == [{"approve": True}]
+    assert b"batch_interventions" in b"".join(websocket.sent)
+
+    await manager.disconnect(websocket)
+    assert manager.get_intervention_responses("session-1") == []
+    assert "session-1" not in manager._unsent_responses
+
+
+@pytest.mark.asyncio
+async def test_response_after_reconnect_within_grace_period(manager, monkeypatch):
+    # Even an immediate idle expiry leaves a session with running work alone
+    monkeypatch.setattr(websocket_module, "IDLE_SESSION_TTL", 0)
+    websocket = FakeWebSocket()
+    await manager.connect(websocket, "session-1")
+    runner = asyncio.ensure_future(
+        manager.run_while_connected("session-1", _finish([], delay=0.2), grace_period=0.15)
+    )
+    await asyncio.sleep(0)
+    await manager.request_intervention("session-1", "score", {})
+    intervention_id = manager.get_interventions("session-1")[0]["intervention_id"]
+
+    await manager.disconnect(websocket)
+    await asyncio.sleep(0.05)
+    reconnected = FakeWebSocket()
+    await manager.connect(reconnected, "session-1")
+    await manager.handle_client_message(reconnected, InterventionResponseMessage(
+        type="intervention_response", intervention_id=intervention_id, response={"approve": True}
+    ))
+    await _settle()
+
+    assert [item["response"] for item in manager.get_intervention_responses("session-1")] == [{"approve": True}]
+    assert b"Unknown intervention" not in b"".join(reconnected.sent)
+    assert await runner == "done"
+    await manager.disconnect(reconnected)
+
+
+@pytest.mark.asyncio
+async def test_abandoned_session_state_cleared(manager):
+    websocket = FakeWebSocket()
+    await manager.connect(websocket, "session-1")
+    runner = asyncio.ensure_future(
+        manager.run_while_connected("session-1", _finish([], delay=1), grace_period=0.05)
+    )
+    await asyncio.sleep(0)
+    await manager.request_intervention("session-1", "score", {})
+
+    await manager.disconnect(websocket)
+    assert len(manager.get_interventions("session-1")) == 1
+
+    with pytest.raises(SessionAbandonedError):
+        await asyncio.wait_for(runner, 0.5)
+    assert manager.get_interventions("session-1") == []
+    assert "session-1" not in manager._watchers
+
+
+@pytest.mark.asyncio
+async def test_stalled_socket_closed_for_reconnect(manager, monkeypatch):
+    monkeypatch.setattr(websocket_module, "SEND_TIMEOUT", 0.05)
+    websocket = StalledWebSocket()
+    await manager.connect(websocket, "session-1")
+
+    await asyncio.sleep(0.2)
+
+    assert websocket.close_code == STALLED_CLOSE_CODE
+    assert not manager.has_connections("session-1")
+
+
+@pytest.mark.asyncio
+async def test_error_frames_share_the_outbox(manager, monkeypatch):
+    monkeypatch.setattr(websocket_endpoints, "websocket_manager", manager)
+    websocket = FakeWebSocket()
+    await manager.connect(websocket, "session-1")
+    await manager.broadcast_to_session("session-1", {"type": "process_update"})
+
+    await websocket_endpoints._dispatch_batch(websocket, ["{not json", '{"type": "unknown"}'])
+    assert websocket.sent == []
+
+    await _settle()
+    frames = b"".join(websocket.sent)
+    assert frames.index(b"connection_established") < frames.index(b"process_update")
+    assert frames.index(b"process_update") < frames.index(INVALID_JSON_FRAME)
+    assert frames.index(INVALID_JSON_FRAME) < frames.index(INVALID_MESSAGE_FRAME)
+    await manager.disconnect(websocket)
+
+
+def _unwrap(frames):
+    """Messages carried by the sent frames, with batch frames flattened"""
+    messages = []
+    for frame in frames:
+        message = orjson.loads(frame)
+        if message["type"] == "batch":
+            messages.extend(message["messages"])
+        else:
+            messages.append(message)
+    return messages
+
+
+@pytest.mark.asyncio
+async def test_writer_batches_within_size_limit(manager):
+    websocket = SlowWebSocket()
+    await manager.connect(websocket, "session-1")
+
+    for index in range(60):
+        await manager.broadcast_to_session("session-1", {"type": "process_update", "index": index, "pad": "x" * 500})
+    for _ in range(100):
+        await asyncio.sleep(0.002)
+        if len(_unwrap(websocket.sent)) == 61:
+            break
+
+    messages = _unwrap(websocket.sent)
+    assert [message["index"] for message in messages[1:]] == list(range(60))
+    assert any(orjson.loads(frame)["type"] == "batch" for frame in websocket.sent)
+    assert all(len(frame) <= MAX_BATCH_BYTES for frame in websocket.sent)
+    await manager.disconnect(websocket)
+
+
+@pytest.mark.asyncio
+async def test_pings_in_one_batch_answered_once(manager, monkeypatch):
+    monkeypatch.setattr(websocket_endpoints, "websocket_manager", manager)
+    websocket = FakeWebSocket()
+    await manager.connect(websocket, "session-1")
+
+    await websocket_endpoints._dispatch_batch(websocket, ['{"type": "ping"}'] * 3)
+    await _settle()
+
+    assert b"".join(websocket.sent).count(PONG_FRAME) == 1
+    await manager.disconnect(websocket)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("frame, error_frame", [
+    ("{not json", INVALID_JSON_FRAME),
+    ('{"type": "unknown"}', INVALID_MESSAGE_FRAME),
+    ('{"type": "intervention_response"}', INVALID_MESSAGE_FRAME),
+    ('["ping"]', INVALID_MESSAGE_FRAME),
+])
+async def test_invalid_frames_answered_with_error(manager, monkeypatch, frame, error_frame):
+    monkeypatch.setattr(websocket_endpoints, "websocket_manager", manager)
+    websocket = FakeWebSocket()
+    await manager.connect(websocket, "session-1")
+
+    await websocket_endpoints._dispatch_batch(websocket, [frame])
+    await _settle()
+
+    assert error_frame in b"".join(websocket.sent)
+    await manager.disconnect(websocket)
+
+
+@pytest.mark.asyncio
+async def test_valid_intervention_response_decoded(manager, monkeypatch):
+    monkeypatch.setattr(websocket_endpoints, "websocket_manager", manager)
+    websocket = FakeWebSocket()
+    await manager.connect(websocket, "session-1")
+    await manager.request_intervention("session-1", "score", {})
+    intervention_id = manager.get_interventions("session-1")[0]["intervention_id"]
+
+    await websocket_endpoints._dispatch_batch(websocket, [orjson.dumps({
+        "type": "intervention_response",
+        "intervention_id": intervention_id,
+        "response": {"score": 80}
+    }).decode()])
+
+    assert [item["response"] for item in manager.get_intervention_responses("session-1")] == [{"score": 80}]
+    await manager.disconnect(websocket)
+
+
+@pytest.fixture
+def monitor_client(monkeypatch):
+    from app.main import app
+    monkeypatch.setattr(get_settings(), "admin_token", "monitor-secret")
+    return TestClient(app)
+
+
+@pytest.mark.parametrize("query", ["", "?admin_token=", "?admin_token=anything"])
+def test_monitor_rejects_bad_admin_token(monitor_client, query):
+    with pytest.raises(WebSocketDisconnect) as excinfo:
+        with monitor_client.websocket_connect("/ws/monitor" + query) as websocket:
+            websocket.receive_bytes()
+
+    assert excinfo.value.code == UNAUTHORIZED_CLOSE_CODE
+
+
+def test_monitor_disabled_without_configured_token(monitor_client, monkeypatch):
+    monkeypatch.setattr(get_settings(), "admin_token", None)
+
+    with pytest.raises(WebSocketDisconnect) as excinfo:
+        with monitor_client.websocket_connect("/ws/monitor?admin_token=monitor-secret") as websocket:
+            websocket.receive_bytes()
+
+    assert excinfo.value.code == UNAUTHORIZED_CLOSE_CODE
+
+
+def test_monitor_accepts_admin_token(monitor_client):
+    with monitor_client.websocket_connect("/ws/monitor?admin_token=monitor-secret") as websocket:
+        assert orjson.loads(websocket.receive_bytes())["type"] == "session_list"